@@ -0,0 +1,258 @@
+"""
+Benchmarks für pong.py (Google: micro benchmark, performance regression)
+
+Misst, wie lange die wichtigsten Teile des Spiels für verschiedene
+Ballanzahlen und Fenstergrößen brauchen:
+
+    python benchmarks.py                   # alle Benchmarks
+    python benchmarks.py --filter step
+    python benchmarks.py --quick           # weniger Wiederholungen
+
+Jeder Lauf wird mit dem aktuellen Git-Commit in 'benchmark_history.jsonl'
+gespeichert und mit dem letzten Lauf eines anderen Commits auf demselben
+Rechner verglichen. Wird ein Benchmark um mehr als '--threshold' (Standard
+10 %) langsamer, wird er als Regression markiert und das Programm endet mit
+dem Rückgabewert 1.
+"""
+
+import os
+
+# Ohne Bildschirm und Soundkarte lauffähig, z.B. auf einem Build-Server
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+import pong
+
+HISTORY_PATH = Path(__file__).resolve().parent / "benchmark_history.jsonl"
+
+WINDOW_SIZES = ((800, 600), (1024, 768), (1920, 1080))
+SPRITE_BALL_COUNTS = (1, 3, 16)
+MATCH_BALL_COUNTS = (1, 3, 64)
+HEADLESS_BALL_COUNTS = (1, 3, 64, 1000)
+SEED = 2024
+
+
+def measure(function, number, repeat):
+    """
+    Ruft 'function' 'repeat' mal je 'number' mal auf (wie 'timeit') und gibt
+    die Sekunden pro Aufruf zurück: das Minimum und den Median der Wiederholungen.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {"min": min(timings), "median": float(np.median(timings))}
+
+
+def _headless_matchfield(ball_count, window_size):
+    app = pong.Application(*window_size, headless=True)
+    return pong.Matchfield(app.main_window, ball_count, headless=True, seed=SEED)
+
+
+def bench_step(ball_count, window_size):
+    # Ohne Eingabequelle bewegt 'step' nur die Bälle, mit allen Kollisionen
+    matchfield = _headless_matchfield(ball_count, window_size)
+    return matchfield.step, 2000
+
+
+def bench_draw_scoreboard(window_size):
+    matchfield = _headless_matchfield(1, window_size)
+    return matchfield._draw_scoreboard, 2000
+
+
+def bench_run_match(ball_count, window_size):
+    app = pong.Application(*window_size)
+    matchfield = pong.Matchfield(app.main_window, ball_count, seed=SEED)
+    return matchfield.run_match, 200
+
+
+def bench_headless_match(ball_count, window_size):
+    # Jeder Aufruf spielt ein ganzes Spiel mit demselben Startwert
+    def play_match():
+        matchfield = _headless_matchfield(ball_count, window_size)
+        pong.play_headless_match(matchfield, points_to_win=3)
+
+    return play_match, 1
+
+
+def benchmark_cases():
+    """Alle Benchmarks als (Name, Funktion, die den Benchmark vorbereitet)."""
+    for window_size in WINDOW_SIZES:
+        size = "{}x{}".format(*window_size)
+
+        for ball_count in SPRITE_BALL_COUNTS:
+            yield (
+                f"step[balls={ball_count},window={size}]",
+                lambda b=ball_count, w=window_size: bench_step(b, w),
+            )
+
+        yield (
+            f"draw_scoreboard[window={size}]",
+            lambda w=window_size: bench_draw_scoreboard(w),
+        )
+
+        for ball_count in MATCH_BALL_COUNTS:
+            yield (
+                f"run_match[balls={ball_count},window={size}]",
+                lambda b=ball_count, w=window_size: bench_run_match(b, w),
+            )
+
+        for ball_count in HEADLESS_BALL_COUNTS:
+            yield (
+                f"headless_match[balls={ball_count},window={size}]",
+                lambda b=ball_count, w=window_size: bench_headless_match(b, w),
+            )
+
+
+def run_benchmarks(name_filter=None, repeat=5, number_scale=1.0):
+    results = {}
+    for name, prepare in benchmark_cases():
+        if name_filter and name_filter not in name:
+            continue
+
+        function, number = prepare()
+        number = max(1, int(number * number_scale))
+
+        # Einmal vorab ausführen: Caches füllen, Bilder umwandeln usw.
+        function()
+        results[name] = measure(function, number, repeat)
+        print(f"{name:<48} {results[name]['min'] * 1e6:12.1f} us")
+
+    return results
+
+
+def _git(*args):
+    try:
+        output = subprocess.run(
+            ["git", *args],
+            cwd=HISTORY_PATH.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip()
+
+
+def current_run_info():
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        # Nicht eingecheckte Änderungen an pong.py verfälschen den Vergleich
+        "modified": bool(_git("status", "--porcelain", "pong.py")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+    }
+
+
+def load_history(path=HISTORY_PATH):
+    if not path.exists():
+        return []
+    with open(path) as history_file:
+        return [json.loads(line) for line in history_file if line.strip()]
+
+
+def find_baseline(history, run, baseline_commit=None):
+    """
+    Sucht den letzten Lauf, mit dem verglichen wird: entweder den Lauf von
+    'baseline_commit' oder den letzten Lauf eines anderen Commits. Es werden
+    nur Läufe auf demselben Rechner verglichen.
+    """
+    for entry in reversed(history):
+        if entry["machine"] != run["machine"]:
+            continue
+        if baseline_commit is not None:
+            if entry["commit"] and entry["commit"].startswith(baseline_commit):
+                return entry
+        elif entry["commit"] != run["commit"] or entry["modified"] != run["modified"]:
+            return entry
+    return None
+
+
+def find_regressions(results, baseline, threshold):
+    """Gibt (Name, alte Zeit, neue Zeit) aller Benchmarks zurück, die langsamer wurden."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if result["min"] > previous["min"] * (1 + threshold):
+            regressions.append((name, previous["min"], result["min"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks für pong.py")
+    parser.add_argument(
+        "--filter", default=None, help="nur Benchmarks mit diesem Text im Namen"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--quick", action="store_true", help="weniger Aufrufe pro Wiederholung"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="ab welcher Verlangsamung eine Regression gemeldet wird (0.10 = 10 %%)",
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="Commit, mit dem verglichen wird"
+    )
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    parser.add_argument(
+        "--no-save", action="store_true", help="Ergebnis nicht im Verlauf speichern"
+    )
+    args = parser.parse_args(argv)
+
+    pygame.init()
+
+    run = current_run_info()
+    run["results"] = run_benchmarks(
+        args.filter, args.repeat, number_scale=0.2 if args.quick else 1.0
+    )
+
+    history = load_history(args.history)
+    baseline = find_baseline(history, run, args.baseline)
+
+    if not args.no_save:
+        with open(args.history, "a") as history_file:
+            history_file.write(json.dumps(run) + "\n")
+
+    if baseline is None:
+        print("\nKein früherer Lauf zum Vergleichen gefunden.")
+        return 0
+
+    regressions = find_regressions(run["results"], baseline, args.threshold)
+    commit = (baseline["commit"] or "?")[:10]
+    print(f"\nVergleich mit {commit} vom {baseline['timestamp']}:")
+    for name, previous, current in regressions:
+        change = (current / previous - 1) * 100
+        print(
+            f"REGRESSION {name}: {previous * 1e6:.1f} us -> {current * 1e6:.1f} us (+{change:.0f} %)"
+        )
+
+    if not regressions:
+        print("Keine Regressionen.")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
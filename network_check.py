@@ -0,0 +1,187 @@
+"""
+Prüft das Spiel zu zweit im Netzwerk (Google: loopback test)
+
+Host und Client laufen in einem einzigen Prozess und schicken sich ihre
+Pakete über 127.0.0.1 zu, genau wie zwei Rechner im Netzwerk:
+
+    python network_check.py
+    python network_check.py --ticks 5000 --loss 0.2
+
+Geprüft wird:
+  * 'SnapshotCodec': Jedes Delta ergibt nach dem Auspacken wieder genau
+    den Frame, aus dem es berechnet wurde. Kaputte Pakete lösen einen
+    'ValueError' aus und werden nicht still falsch ausgepackt.
+  * 'NetworkHost' und 'NetworkClient': Nach jedem empfangenen Zustand hat
+    der Client (Bälle, Schläger, Punkte) genau den Zustand des Hosts, auch
+    wenn mit '--loss' ein Teil der Pakete verloren geht.
+
+Bei einem Fehler endet das Programm mit dem Rückgabewert 1.
+"""
+
+import os
+
+# Ohne Bildschirm und Soundkarte lauffähig, z.B. auf einem Build-Server
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import pong
+
+SEED = 2024
+BALL_COUNTS = (1, 3, 64)
+
+
+def _headless_matchfield(app, ball_count, seed=None):
+    return pong.Matchfield(app.main_window, ball_count, headless=True, seed=seed)
+
+
+def _random_input(rng, up, down):
+    # Jede Eingabe wird ein paar Frames lang gehalten, wie von einem Menschen
+    choices = (0, up, down)
+    state = {"bits": 0}
+
+    def read(matchfield):
+        if rng.random() < 0.1:
+            state["bits"] = rng.choice(choices)
+        return state["bits"]
+
+    return pong.ScriptedInput(read)
+
+
+def check_codec(app, ball_count, frames):
+    """Packt alle Frames eines Spiels als Delta zu älteren Frames ein und aus."""
+    matchfield = _headless_matchfield(app, ball_count, seed=SEED)
+    codec = pong.SnapshotCodec(ball_count)
+
+    history = []
+    for _ in range(frames):
+        matchfield.step()
+        history.append(codec.frame_bytes(matchfield))
+
+    for index, frame_bytes in enumerate(history):
+        for distance in (1, 7, 60):
+            if index < distance:
+                continue
+            base_bytes = history[index - distance]
+            payload = codec.encode_delta(frame_bytes, base_bytes)
+            decoded = codec.decode(pong.SnapshotCodec.DELTA, payload, base_bytes)
+            if decoded != frame_bytes:
+                return [f"Delta {index - distance} -> {index} falsch ausgepackt"]
+
+    # Ein abgeschnittenes Delta und ein zu kurzes Schlüsselbild
+    errors = []
+    for kind, payload, base_bytes in (
+        (pong.SnapshotCodec.DELTA, payload[:-1], base_bytes),
+        (pong.SnapshotCodec.KEYFRAME, history[-1][:-1], None),
+    ):
+        try:
+            codec.decode(kind, payload, base_bytes)
+        except ValueError:
+            continue
+        errors.append(f"kaputtes Paket (Art {kind}) wurde nicht erkannt")
+
+    return errors
+
+
+def check_loopback(app, ball_count, ticks, loss=0.0):
+    """
+    Spielt 'ticks' Schritte über 127.0.0.1. Mit 'loss' (0 bis 1) wirft der
+    Client einen Teil der Zustände weg, bevor er sie liest.
+    """
+    rng = random.Random(SEED)
+
+    host_field = _headless_matchfield(app, ball_count, seed=SEED)
+    host_field.input_source = _random_input(
+        rng, pong.INPUT_LEFT_UP, pong.INPUT_LEFT_DOWN
+    )
+    client_field = _headless_matchfield(app, ball_count)
+    client_field.input_source = _random_input(
+        rng, pong.INPUT_RIGHT_UP, pong.INPUT_RIGHT_DOWN
+    )
+
+    host = pong.NetworkHost(host_field, keyframe_interval=60)
+    client = pong.NetworkClient(client_field, host.address)
+    codec = host.codec
+
+    errors = []
+    received = 0
+    try:
+        for _ in range(ticks):
+            client.send_input()
+
+            # Auf 127.0.0.1 ist das Paket praktisch sofort da, sicherheitshalber
+            # wartet der Host aber kurz auf den Client
+            deadline = time.monotonic() + 1.0
+            while not host.tick():
+                if time.monotonic() > deadline:
+                    return errors + ["Host hat keine Eingabe vom Client bekommen"]
+                time.sleep(0.001)
+
+            if rng.random() < loss:
+                for _ in pong._receive_all(client.socket):
+                    pass
+                continue
+
+            if not client.poll():
+                continue
+            received += 1
+
+            host_bytes = codec.frame_bytes(host_field)
+            client_bytes = codec.frame_bytes(client_field)
+            if client_bytes != host_bytes:
+                host_frame = codec.frame(host_bytes)
+                client_frame = codec.frame(client_bytes)
+                differences = [
+                    name
+                    for name in host_frame.dtype.names
+                    if not np.array_equal(host_frame[name], client_frame[name])
+                ]
+                errors.append(
+                    f"Tick {host_field.ticks}: Client weicht ab ({', '.join(differences)})"
+                )
+                break
+    finally:
+        host.close()
+        client.close()
+
+    if not received:
+        errors.append("Client hat keinen einzigen Zustand bekommen")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Netzwerk-Check für pong.py")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument(
+        "--loss", type=float, default=0.1, help="Anteil verlorener Zustände (0 bis 1)"
+    )
+    args = parser.parse_args(argv)
+
+    app = pong.Application(pong.WINDOW_WIDTH, pong.WINDOW_HEIGHT, headless=True)
+
+    failed = False
+    for ball_count in BALL_COUNTS:
+        for name, errors in (
+            ("codec", check_codec(app, ball_count, min(args.ticks, 600))),
+            ("loopback", check_loopback(app, ball_count, args.ticks)),
+            (
+                f"loopback, {args.loss:.0%} Verlust",
+                check_loopback(app, ball_count, args.ticks, args.loss),
+            ),
+        ):
+            status = "FEHLER" if errors else "ok"
+            print(f"{name + f'[balls={ball_count}]':<40} {status}")
+            for error in errors:
+                print(f"    {error}")
+            failed |= bool(errors)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,25 @@
 #!/usr/bin/python
 
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from enum import Enum, unique, auto
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
 import random
 import os
 import pathlib
+import queue
+import socket
+import struct
+import threading
+import time
+
+# Unterdrückt die Begrüßung von pygame auf stdout, damit die Ausgabe von
+# 'python -m pong simulate' maschinenlesbar (JSON) bleibt
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
 import pygame
 from pygame.locals import *
 from dataclasses import dataclass, field
@@ -28,6 +44,19 @@ class Version:
 VERSION = Version(0, 0, 1, "a")
 WINDOW_WIDTH = 1024  # width of the game window
 WINDOW_HEIGHT = 768  # height of the game window
+FIELD_COLOR = (26, 62, 102)  # Hintergrundfarbe des Spielfeldes
+
+# Ab dieser Anzahl an Bällen rechnet 'Matchfield' mit 'BallArrays' statt
+# mit einzelnen 'Ball'-Sprites
+VECTORIZED_BALL_THRESHOLD = 64
+
+# Eingaben beider Spieler als Bits in einer einzigen Zahl (Google: bit flags)
+INPUT_LEFT_UP = 1  # W
+INPUT_LEFT_DOWN = 2  # S
+INPUT_RIGHT_UP = 4  # Pfeil nach oben
+INPUT_RIGHT_DOWN = 8  # Pfeil nach unten
+INPUT_LEFT = INPUT_LEFT_UP | INPUT_LEFT_DOWN
+INPUT_RIGHT = INPUT_RIGHT_UP | INPUT_RIGHT_DOWN
 
 _DEBUG_MODE = True
 
@@ -47,11 +76,20 @@ class Application:
     # Python deklariert interne Methoden (bereits in Python selbst integriert)
     # häufig mit zwei Unterschtrichen, um dem Programmierer keine
     # 'Namen zu klauen'
-    def __init__(self, window_width, window_height, caption="Codecentric: Pong"):
+    def __init__(
+        self, window_width, window_height, caption="Codecentric: Pong", headless=False
+    ):
         window_size = (window_width, window_height)
-        self.main_window = pygame.display.set_mode(window_size)
+        self.headless = headless
+
+        if headless:
+            # Ohne Bildschirm (z.B. auf einem Build-Server) wird nur in eine
+            # Surface im Arbeitsspeicher gezeichnet. Es öffnet sich kein Fenster.
+            self.main_window = pygame.Surface(window_size)
+        else:
+            self.main_window = pygame.display.set_mode(window_size)
+            pygame.display.set_caption(caption)
 
-        pygame.display.set_caption(caption)
         self.clock = pygame.time.Clock()
 
         # Zeigt an, ob das Programm in der 'Game-Loop' ausgeführt wird
@@ -73,32 +111,278 @@ class Application:
         return pathlib.Path(__file__).parent.resolve()
 
 
+def prepare_surface(surface, alpha=False):
+    """
+    Wandelt eine Surface in das Pixelformat des Bildschirms um.
+
+    Surfaces mit demselben Pixelformat wie das Fenster können deutlich
+    schneller gezeichnet werden (Google: pygame Surface convert). Ohne
+    geöffnetes Fenster (z.B. im 'headless' Modus) gibt es kein Zielformat,
+    dann bleibt die Surface unverändert.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class FontRegistry:
+    """
+    Lädt jede Schriftart (Name und Größe) nur ein einziges Mal.
+
+    'pygame.font.SysFont' durchsucht bei jedem Aufruf die Schriftarten des
+    Betriebssystems. Das ist für jeden Frame viel zu langsam, daher werden
+    die Schriftarten hier zwischengespeichert (Google: Caching).
+    """
+
+    def __init__(self):
+        self._fonts = {}
+
+    def get(self, name, size):
+        key = (name, size)
+        if key not in self._fonts:
+            self._fonts[key] = pygame.font.SysFont(name, size)
+        return self._fonts[key]
+
+
+# Google: Singleton
+FONTS = FontRegistry()
+
+
+class RandomStream:
+    """
+    Ein Vorrat an Zufallszahlen, der immer blockweise aufgefüllt wird.
+
+    Einzelne Zufallszahlen aus numpy zu ziehen ist vergleichsweise teuer.
+    Deshalb werden z.B. 4096 Zahlen auf einmal erzeugt und danach eine nach
+    der anderen aus der Liste genommen.
+    """
+
+    def __init__(self, draw_block, block_size=4096):
+        # 'draw_block' ist eine Funktion: Anzahl -> numpy array
+        self._draw_block = draw_block
+        self.block_size = block_size
+        self._refill()
+
+    def _refill(self):
+        self._array = self._draw_block(self.block_size)
+        self._values = self._array.tolist()  # Python-Zahlen für 'next'
+        self._index = 0
+
+    def next(self):
+        if self._index >= self.block_size:
+            self._refill()
+
+        value = self._values[self._index]
+        self._index += 1
+        return value
+
+    def take(self, count):
+        """Gibt 'count' Zufallszahlen als numpy array zurück."""
+        if count > self.block_size:
+            return self._draw_block(count)
+
+        parts = []
+        while count > 0:
+            if self._index >= self.block_size:
+                self._refill()
+
+            part = self._array[self._index : self._index + count]
+            self._index += part.size
+            count -= part.size
+            parts.append(part)
+
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else self._array[:0]
+
+
+class MatchRandom:
+    """
+    Alle Zufallszahlen eines Spiels aus einem eigenen 'numpy.random.Generator'.
+
+    Mit demselben 'seed' (Startwert) entstehen immer exakt dieselben Spiele
+    (Google: reproducible random numbers). Jede Art von Zufallszahl hat einen
+    eigenen Generator, damit z.B. die Ballfarben nicht die Aufschläge ändern.
+    """
+
+    def __init__(self, seed=None, block_size=4096):
+        self.seed = seed
+
+        # Google: numpy SeedSequence spawn
+        serve_rng, direction_rng, strike_rng, color_rng, other_rng = (
+            np.random.default_rng(child)
+            for child in np.random.SeedSequence(seed).spawn(5)
+        )
+
+        self._serve_angle = RandomStream(
+            lambda count: serve_rng.normal(scale=4.5, size=count), block_size
+        )
+        self._direction = RandomStream(
+            lambda count: direction_rng.integers(0, 2, size=count) * 2 - 1, block_size
+        )
+        self._strike_angle = RandomStream(
+            lambda count: strike_rng.normal(scale=6.5, size=count), block_size
+        )
+        # Jeder Farbkanal kann nur 6 Werte (0, 51, ..., 255) annehmen
+        self._color_channel = RandomStream(
+            lambda count: color_rng.integers(0, 6, size=count) * 51, block_size
+        )
+        self.generator = other_rng
+
+    def serve(self):
+        """Richtung (-1 oder 1) und Winkel eines Aufschlags."""
+        return self._direction.next(), self._serve_angle.next()
+
+    def serves(self, count):
+        return self._direction.take(count), self._serve_angle.take(count)
+
+    def strike_angle(self):
+        return self._strike_angle.next()
+
+    def strike_angles(self, count):
+        return self._strike_angle.take(count)
+
+    def ball_color(self):
+        return [self._color_channel.next() for _ in range(3)]
+
+
+_default_random = None
+
+
+def default_random():
+    """Gemeinsamer Zufallsgenerator für Objekte, die zu keinem Spiel gehören."""
+    global _default_random
+    if _default_random is None:
+        _default_random = MatchRandom()
+    return _default_random
+
+
+class AssetLoader:
+    """
+    Lädt Dateien aus dem Ordner 'data' in einem eigenen Thread, damit das
+    erste Bild nicht warten muss, bis alle Sounds von einer langsamen
+    Speicherkarte gelesen sind (Google: asynchronous asset loading).
+
+    Der Pfad zum Ordner wird nur einmal bestimmt. 'get' gibt 'None' zurück,
+    solange eine Datei noch nicht fertig geladen ist oder nicht geladen
+    werden konnte (dann steht der Fehler in 'errors').
+    """
+
+    def __init__(self, root=None):
+        if root is None:
+            root = Application.root_path()
+        self.data_path = pathlib.Path(root) / "data"
+        self.errors = {}
+
+        self._assets = {}
+        self._requested = set()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def path(self, *parts):
+        return self.data_path.joinpath(*parts)
+
+    def load_sound(self, *parts):
+        """Lädt eine Datei als 'pygame.mixer.Sound', z.B. ("sounds", "beep.wav")."""
+        self._request(parts, lambda path: pygame.mixer.Sound(str(path)))
+
+    def load_bytes(self, *parts):
+        """Liest eine Datei nur in den Speicher, z.B. für 'pygame.mixer.music'."""
+        self._request(parts, lambda path: path.read_bytes())
+
+    def _request(self, parts, load):
+        if parts in self._requested:
+            return
+        self._requested.add(parts)
+        self._queue.put((parts, load))
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load_loop, daemon=True)
+            self._thread.start()
+
+    def _load_loop(self):
+        while True:
+            parts, load = self._queue.get()
+            try:
+                self._assets[parts] = load(self.path(*parts))
+            except (OSError, pygame.error) as error:
+                self.errors[parts] = error
+            finally:
+                self._queue.task_done()
+
+    def get(self, *parts):
+        return self._assets.get(parts)
+
+    def wait(self):
+        """Wartet, bis alle angeforderten Dateien geladen sind."""
+        self._queue.join()
+
+
+_default_assets = None
+
+
+def default_assets():
+    """Gemeinsamer Loader, damit jede Datei nur einmal gelesen wird."""
+    global _default_assets
+    if _default_assets is None:
+        _default_assets = AssetLoader()
+    return _default_assets
+
+
 class GameSounds:
     # Google: static variable
     available_music = list(["night_ride.ogg", "bladerunner.ogg"])
 
-    def __init__(self, pong_sound):
-        pong_sound_path = self._set_path_to(pong_sound)
-        self.pong_sound = pygame.mixer.Sound(pong_sound_path)
+    def __init__(self, pong_sound, muted=False, assets=None):
+        # Im stummen Modus wird der Mixer nie angefasst. So läuft das Spiel
+        # auch auf Rechnern ohne Soundkarte.
+        self.muted = muted
 
         self.selected_song = random.choice(GameSounds.available_music)
-        self.play_background_music()
+        self.isBackgroundOn = not muted
+
+        if muted:
+            self.pong_sound = None
+            return
 
-        self.isBackgroundOn = True
+        # Die Dateien werden im Hintergrund geladen. Bis sie fertig sind,
+        # bleibt es einfach still.
+        self.assets = assets if assets is not None else default_assets()
+        self.pong_sound = ("sounds", pong_sound)
+        self.assets.load_sound(*self.pong_sound)
+        self.assets.load_bytes("sounds", self.selected_song)
 
-    def _set_path_to(self, file):
-        # Google: variable scope
-        # (deu. Sichtbarkeitsbereich einer Variable)
-        root_path = Application.root_path()
-        return os.path.join(root_path, "data", "sounds", file)
+        self._music_file = None
+        self.update()
+
+    def update(self):
+        """Startet die Hintergrundmusik, sobald sie geladen ist."""
+        if self.muted or not self.isBackgroundOn or self._music_file is not None:
+            return
+
+        self.play_background_music()
 
     def play_pong_sound(self):
-        pygame.mixer.Channel(1).play(self.pong_sound)
+        if self.muted:
+            return
+
+        sound = self.assets.get(*self.pong_sound)
+        if sound is None:
+            return
+
+        pygame.mixer.Channel(1).play(sound)
         pygame.mixer.Channel(1).set_volume(0.15)
 
     def play_background_music(self):
-        path_to_song = self._set_path_to(self.selected_song)
-        pygame.mixer.music.load(path_to_song)
+        song = self.assets.get("sounds", self.selected_song)
+        if song is None:
+            return
+
+        # 'pygame.mixer.music' liest die Datei während des Abspielens,
+        # deshalb muss 'io.BytesIO' so lange erhalten bleiben
+        self._music_file = io.BytesIO(song)
+        pygame.mixer.music.load(self._music_file, self.selected_song)
 
         # Spielt den Song von vorne (Parameter 0.0) in einer Schleife (Parameter -1) ab
         pygame.mixer.music.play(-1, 0.0)
@@ -107,13 +391,19 @@ class GameSounds:
         pygame.mixer.music.set_volume(0.02)
 
     def toggle_background_music(self):
+        if self.muted:
+            return
+
         if self.isBackgroundOn:
             pygame.mixer.music.pause()
             self.isBackgroundOn = False
         else:
+            self.isBackgroundOn = True
+            if self._music_file is None:
+                # Noch nicht geladen, 'update' startet die Musik später
+                return
             pygame.mixer.music.play(-1, 0.0)
             # self.play_background_music()
-            self.isBackgroundOn = True
 
 
 # Google: Objektorientierte Vererbung
@@ -134,31 +424,177 @@ class Player(pygame.sprite.Sprite):
 
         self.speed = 8
 
+        # Nachkommastellen der Bewegung, die 'rect' (nur ganze Pixel) nicht
+        # speichern kann, z.B. bei einer Physik mit 144 Hz
+        self._subpixel_y = 0.0
+
     def position(self, move_px):
-        self.rect.y += move_px
+        move_px += self._subpixel_y
+        whole_px = round(move_px)
+        self._subpixel_y = move_px - whole_px
+        self.rect.y += whole_px
 
 
-class Ball(pygame.sprite.Sprite):
-    def __init__(self, background_color=(255, 255, 255, 255)):
+class Obstacle(pygame.sprite.Sprite):
+    """Ein festes Hindernis auf dem Spielfeld, von dem die Bälle abprallen."""
+
+    def __init__(self, rect, color=(200, 200, 200)):
         pygame.sprite.Sprite.__init__(self)
 
-        # pygame Konfiguration: Jedes Objekt, was von 'pygame.sprite.Sprite'
-        # erbt, benötigt ein self.image und self.rect Objekt
-        self.image = pygame.Surface([18, 18])
-        self.rect = self.image.get_rect()
-        self.ball_color = self._generate_ball_color()
+        self.rect = pygame.Rect(rect)
+        self.image = pygame.Surface(self.rect.size)
+        self.image.fill(color)
+
+
+def swept_aabb(rect, travel, target):
+    """
+    Berechnet, wann ein Rechteck 'rect' auf dem Weg 'travel' (x, y) das
+    Rechteck 'target' zum ersten Mal berührt.
+
+    Gibt (Zeitpunkt zwischen 0 und 1, Achse der Kollision) zurück oder None,
+    falls sich beide Rechtecke auf dem Weg nicht berühren. Überlappen sich
+    die Rechtecke schon am Anfang, ist der Zeitpunkt 0.
+    """
+    entry = [0.0, 0.0]
+    exit = [0.0, 0.0]
+
+    for axis, (low, high, target_low, target_high) in enumerate(
+        (
+            (rect.left, rect.right, target.left, target.right),
+            (rect.top, rect.bottom, target.top, target.bottom),
+        )
+    ):
+        velocity = travel[axis]
+        if velocity > 0:
+            entry[axis] = (target_low - high) / velocity
+            exit[axis] = (target_high - low) / velocity
+        elif velocity < 0:
+            entry[axis] = (target_high - low) / velocity
+            exit[axis] = (target_low - high) / velocity
+        elif high <= target_low or low >= target_high:
+            # Keine Bewegung auf dieser Achse und kein Überlappen
+            return None
+        else:
+            entry[axis] = -float("inf")
+            exit[axis] = float("inf")
+
+    entry_time = max(entry)
+    exit_time = min(exit)
+    if entry_time >= exit_time or entry_time >= 1.0 or exit_time <= 0.0:
+        return None
+
+    axis = 0 if entry[0] > entry[1] else 1
+    return max(entry_time, 0.0), axis
+
+
+def _moves_towards(rect, travel, target, axis):
+    # Gleiches Vorzeichen von Abstand und Bewegung: der Ball fliegt auf das Ziel zu
+    return (target.center[axis] - rect.center[axis]) * travel[axis] > 0
+
+
+class SpatialHash:
+    """
+    Ein gleichmäßiges Gitter (engl. uniform grid) über dem Spielfeld.
+
+    Jedes Objekt wird in alle Zellen eingetragen, die sein Rechteck berührt.
+    Ein Ball muss dann nur noch mit den Objekten aus seinen eigenen Zellen
+    verglichen werden, statt mit allen Objekten auf dem Spielfeld
+    (Google: broad phase collision detection, spatial hashing).
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+
+    def clear(self):
+        self._cells.clear()
+
+    def _cells_for(self, rect):
+        cell_size = self.cell_size
+        for cell_x in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+            for cell_y in range(
+                rect.top // cell_size, (rect.bottom - 1) // cell_size + 1
+            ):
+                yield cell_x, cell_y
+
+    def insert(self, item, rect):
+        for cell in self._cells_for(rect):
+            self._cells[cell].append(item)
+
+    def query(self, rect):
+        """Gibt alle Objekte zurück, die in einer Zelle von 'rect' liegen."""
+        # Objekte über mehreren Zellen sollen nur einmal vorkommen
+        found = {}
+        for cell in self._cells_for(rect):
+            for item in self._cells.get(cell, ()):
+                found[id(item)] = item
+        return list(found.values())
+
+
+class BallImageCache:
+    """
+    Gemeinsame Bilder (engl. sprite atlas) für alle Bälle.
+
+    Bälle mit gleicher Farbe, gleichem Radius und gleicher Hintergrundfarbe
+    teilen sich eine einzige Surface. Bei tausenden Bällen muss so nicht für
+    jeden Ball eine eigene Surface angelegt und bemalt werden.
+    """
+
+    def __init__(self):
+        self._images = {}
+
+    def get(self, ball_color, ball_radius, background_color, size=18):
+        key = (tuple(ball_color), ball_radius, tuple(background_color), size)
+
+        # Bilder, die ohne Fenster erstellt wurden, werden umgewandelt,
+        # sobald es ein Fenster (und damit ein Pixelformat) gibt
+        image, is_prepared = self._images.get(key, (None, False))
+        if image is None or (
+            not is_prepared and pygame.display.get_surface() is not None
+        ):
+            image = prepare_surface(
+                self._draw(ball_color, ball_radius, background_color, size)
+            )
+            is_prepared = pygame.display.get_surface() is not None
+            self._images[key] = (image, is_prepared)
+
+        return image
+
+    @staticmethod
+    def _draw(ball_color, ball_radius, background_color, size):
+        image = pygame.Surface([size, size])
+        image.fill(background_color)
+        pygame.draw.circle(image, ball_color, (size // 2, size // 2), ball_radius)
+        return image
+
+    def __len__(self):
+        return len(self._images)
+
 
-        self.image.fill(background_color)
+# Google: Singleton
+BALL_IMAGES = BallImageCache()
 
+
+class Ball(pygame.sprite.Sprite):
+    def __init__(self, background_color=(255, 255, 255, 255), match_random=None):
+        pygame.sprite.Sprite.__init__(self)
+
+        # Zufallszahlen des Spiels, zu dem der Ball gehört
+        self.random = match_random if match_random is not None else default_random()
+
+        self.ball_color = self._generate_ball_color()
         self.ball_radius = 7
 
-        ball_center_coords = (self.rect.centerx, self.rect.centery)
-        self.drawn_ball = pygame.draw.circle(
-            self.image,
-            self.ball_color,
-            ball_center_coords,
-            self.ball_radius,
+        # pygame Konfiguration: Jedes Objekt, was von 'pygame.sprite.Sprite'
+        # erbt, benötigt ein self.image und self.rect Objekt.
+        # Das Bild wird mit allen Bällen der gleichen Farbe geteilt.
+        self.image = BALL_IMAGES.get(
+            self.ball_color, self.ball_radius, background_color
         )
+        self.rect = self.image.get_rect()
+
+        self.drawn_ball = pygame.Rect(0, 0, self.ball_radius * 2, self.ball_radius * 2)
+        self.drawn_ball.center = self.rect.center
 
         """
         Der Ball bewegt sich 2-Dimensional. Das bedeutet, anders
@@ -176,12 +612,14 @@ class Ball(pygame.sprite.Sprite):
         self.first_serve()
 
     def _generate_ball_color(self):
-        # Google: Python List comprehension
-        return [random.randint(0, 255) for _ in range(3)]
+        # Jeder Farbkanal kann nur 6 Werte (0, 51, ..., 255) annehmen. Damit
+        # gibt es höchstens 216 verschiedene Ballfarben und Bilder.
+        return self.random.ball_color()
 
     # Macht den ersten Aufschlag in eine zufällige Richtung
     def first_serve(self):
         self.speed = np.array([5, 1])
+        self._subpixel = [0.0, 0.0]
 
         # Erstellt ein numpy array mit zwei Einträgen und wählt zufällig
         # aus den beiden Werten aus. Die Variable 'y_angle' gibt den Winkel des
@@ -191,8 +629,8 @@ class Ball(pygame.sprite.Sprite):
         #                                        v              v
         #                     _________________________   _______________________
         #                    |                         | |                       |
-        direction = np.array([np.random.choice([-1, 1]), np.random.normal(scale=4.5)])
-        #                                                np.random.normal vvv
+        direction = np.array(self.random.serve())
+        #            Normalverteilung, wie np.random.normal(scale=4.5) vvv
         # https://numpy.org/doc/stable/reference/random/generated/numpy.random.normal.html
 
         """
@@ -219,221 +657,3546 @@ class Ball(pygame.sprite.Sprite):
         self.rect.x += self.speed[0]
         self.rect.y += self.speed[1]
 
+    def move_by(self, travel):
+        # Nachkommastellen werden für den nächsten Schritt aufgehoben, da
+        # 'rect' nur ganze Pixel speichern kann
+        x = travel[0] + self._subpixel[0]
+        y = travel[1] + self._subpixel[1]
+        whole_x = round(x)
+        whole_y = round(y)
+        self._subpixel = [x - whole_x, y - whole_y]
+
+        self.rect.x += whole_x
+        self.rect.y += whole_y
+
     def remove_from_match(self):
         self.rect.x = 1
         self.rect.y = 1
         self.speed *= np.array([0])
 
 
-class Matchfield:
-    def __init__(self, main_window, ball_count=3):
-        self.main_window = main_window
+def swept_entry_times(position, travel, size, left, top, right, bottom):
+    """
+    Die numpy Variante von 'swept_aabb' für viele Bälle (Breite und Höhe
+    'size') auf einmal. 'position' (linke obere Ecke) und 'travel' haben die
+    Form (..., 2). Die Ränder des Ziels dürfen Zahlen oder arrays sein, die
+    zu den Bällen passen (Google: numpy broadcasting), z.B. ein Schläger pro
+    Spiel in 'MatchBatch'.
 
-        # Google: Python Variable encapsulation
-        self._redraw_field()
+    Gibt den Zeitpunkt (0 bis 1) der ersten Berührung und ob es überhaupt
+    eine Berührung gibt zurück.
+    """
+    entry = []
+    exit = []
+    for axis, (target_low, target_high) in enumerate(((left, right), (top, bottom))):
+        low = position[..., axis].astype(np.float64)
+        high = low + size
+        velocity = travel[..., axis].astype(np.float64)
+        overlaps = (high > target_low) & (low < target_high)
 
-        self.main_window_background_color = main_window.get_at((0, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            towards_low = (target_low - high) / velocity
+            towards_high = (target_high - low) / velocity
 
-        self.max_active_balls_on_field = ball_count
-        self.current_active_balls_on_field = ball_count
-        self.balls = [
-            Ball(self.main_window_background_color) for _ in range(0, ball_count)
-        ]
+        # Ohne Bewegung: entweder immer (Überlappung) oder nie im Weg
+        standing_entry = np.where(overlaps, -np.inf, np.inf)
+        standing_exit = np.where(overlaps, np.inf, -np.inf)
+        entry.append(
+            np.where(
+                velocity > 0,
+                towards_low,
+                np.where(velocity < 0, towards_high, standing_entry),
+            )
+        )
+        exit.append(
+            np.where(
+                velocity > 0,
+                towards_high,
+                np.where(velocity < 0, towards_low, standing_exit),
+            )
+        )
 
-        self.player_left = Player(PlayerSide.LEFT)
-        self.player_right = Player(PlayerSide.RIGHT)
+    entry_time = np.maximum(entry[0], entry[1])
+    exit_time = np.minimum(exit[0], exit[1])
+    is_hit = (entry_time < exit_time) & (entry_time < 1.0) & (exit_time > 0.0)
+    return np.maximum(entry_time, 0.0), is_hit
 
-        # Google: Python v
-        # ariable encapsulation
-        self._reset_game()
 
-        self.sounds = GameSounds("beep.wav")
+def paddle_impact_times(position, travel, size, left, top, right, bottom):
+    """
+    Zeitpunkt (0 bis 1), an dem jeder Ball den Schläger trifft, oder 'inf'.
+    Wie in 'Matchfield._sweep_ball' werden nur Bälle zurückgespielt, die auf
+    den Schläger zufliegen.
+    """
+    entry_time, is_hit = swept_entry_times(
+        position, travel, size, left, top, right, bottom
+    )
 
-        self.game_object_sprites = pygame.sprite.Group()
-        self.game_object_sprites.add(self.balls, self.player_left, self.player_right)
+    # Wie 'pygame.Rect.centerx'
+    paddle_center = left + (right - left) // 2
+    ball_center = position[..., 0] + size / 2
+    velocity = travel[..., 0]
+    is_hit &= (velocity != 0) & (
+        np.sign(paddle_center - ball_center) == np.sign(velocity)
+    )
+    return np.where(is_hit, entry_time, np.inf)
 
-        self.debugger = None
 
-    def move_ball(self, ball):
+def strike_balls(position, speed, travel, hits, time_of_impact, strike_angle, frames=1):
+    """
+    Spielt die Bälle 'hits' (Indizes in 'position' und 'speed') wie
+    'Matchfield._strike_ball' zurück: Sie fliegen nur bis zum Schläger und
+    den Rest des Schrittes in die neue Richtung. 'position' ist dabei schon
+    um den ganzen Weg 'travel' verschoben.
+    """
+    remaining = (1.0 - time_of_impact)[:, np.newaxis]
+    position[hits] -= np.rint(travel[hits] * remaining).astype(np.int32)
 
-        """
-        |                     |   Der Ausdruck auf der rechten Seite gibt einen booleschen
-        |  <------ ° ------>  |   Wert zurück (True/False). Dieser Zeigt an, ob der Ball
-        |                     |   die rechte oder linke Wand berührt hat.
-        """
-        right_wall_collision = self.main_window.get_rect().right < ball.rect.right
-        left_wall_collision = self.main_window.get_rect().left > ball.rect.left
+    hit_speed = speed[hits]
+    y_angle_sign = np.where(hit_speed[:, 1] < 0, -1, 1)
 
-        """
-        _________.______________   Hier gilt wie oben beschrieben, die gleiche Logik.
-        .      .  . ^              Diesmal wird jedoch geschaut, ob der Ball über
-         .    .     °              Bande gespielt wurde.
-          .  .      v              Dadurch wird der y-Wert in der 'Ball.speed' Variable
-        ____.___________________   mit -1 multiplizert (Vorzeichen wird umgekehrt).
-        """
-        top_wall_collision = self.main_window.get_rect().top > ball.rect.top
-        bottom_wall_collision = self.main_window.get_rect().bottom < ball.rect.bottom
+    hit_speed[:, 0] += np.sign(hit_speed[:, 0])
+    hit_speed[:, 0] *= -1
+    hit_speed[:, 1] = strike_angle * y_angle_sign
+    speed[hits] = hit_speed
 
-        # Hier werden die Teilergebnise aus den beiden oberen Ausdrücken
-        # zu einem Ergebnis durch ein OR zusammengefasst
-        # Google: Logikgatter
-        top_bot_wall_collision = top_wall_collision or bottom_wall_collision
+    position[hits] += np.rint(hit_speed * frames * remaining).astype(np.int32)
 
-        # Falls der Ball einen Schläger trifft, soll sich die "Flugrichtung" des Balles
-        # umkehren. Das beudetet, wir multiplizieren diesmal den x-Wert der Variable
-        # 'Ball.speed'.
-        paddle1_collision = self.player_left.rect.colliderect(ball.rect)
-        paddle2_collision = self.player_right.rect.colliderect(ball.rect)
 
-        # Wie oben, Zusammenfassung der Teilergebnisse, da das Vorgehen unabhängig davon ist,
-        # welchen Schläger der Ball berührt.
-        paddle_collision = paddle1_collision or paddle2_collision
+def reflect_from_walls(position, speed, active, top, bottom, size):
+    """
+    Ist ein Ball über die Bande hinausgeflogen, wird seine Position an der
+    Bande gespiegelt, als wäre er genau dort abgeprallt.
+    """
+    y = position[..., 1]
+    above = active & (y < top)
+    below = active & (y + size > bottom)
+    if not (above.any() or below.any()):
+        return
 
-        if right_wall_collision:
-            self.current_active_balls_on_field -= 1
-            ball.remove_from_match()
+    speed_y = speed[..., 1]
+    y[above] = 2 * top - y[above]
+    y[below] = 2 * (bottom - size) - y[below]
+    speed_y[above] = np.abs(speed_y[above])
+    speed_y[below] = -np.abs(speed_y[below])
 
-            if self.current_active_balls_on_field == 0:
-                self.player_left.score += 1
-                self._reset_game()
 
-        elif left_wall_collision:
-            self.current_active_balls_on_field -= 1
-            ball.remove_from_match()
+class BallArrays:
+    """
+    Alle Bälle eines Spielfeldes als 'Structure of Arrays'.
 
-            if self.current_active_balls_on_field == 0:
-                self.player_right.score += 1
-                self._reset_game()
+    Statt vieler einzelner 'Ball'-Objekte liegen die Positionen (linke obere
+    Ecke) und Geschwindigkeiten aller Bälle in zusammenhängenden numpy arrays.
+    Eine Zeile entspricht einem Ball. Alle Kollisionen werden für alle Bälle
+    gleichzeitig berechnet (Google: numpy vectorization).
 
-        elif top_bot_wall_collision:
-            ball.speed *= np.array([1, -1])
-        elif paddle_collision:
-            self.sounds.play_pong_sound()
+    Die Regeln entsprechen denen aus 'Matchfield.move_ball'.
+    """
 
-            # Google: Ternary Operator
-            y_angle_sign = np.sign(ball.speed[1]) if np.sign(ball.speed[1]) else 1
+    size = 18  # Breite und Höhe eines Balles in Pixeln, wie in 'Ball'
+    ball_radius = 7
+    palette_size = 32  # Anzahl unterschiedlicher Ballfarben
+    broad_phase_min_objects = 4
 
-            strike_angle = np.random.normal(scale=6.5)
+    def __init__(self, count, background_color=(255, 255, 255, 255), match_random=None):
+        self.count = count
+        self.random = match_random if match_random is not None else default_random()
 
-            ball.speed[0] += 1 * np.sign(ball.speed[0])
-            ball.speed[0] *= -1
-            ball.speed[1] = strike_angle * y_angle_sign
+        #                 Ball --+  +-- x, y Achse
+        #                        |  |
+        #                        v  v
+        self.position = np.zeros((count, 2), dtype=np.int32)
+        self.speed = np.zeros((count, 2), dtype=np.int32)
+        self.active = np.ones(count, dtype=bool)
 
-        ball.move()
+        # Nachkommastellen der Bewegung bei Kommazahlen für 'frames'
+        self._subpixel = np.zeros((count, 2))
 
-    def move_player(self):
-        if pygame.key.get_pressed()[pygame.K_w]:
-            move_player_px = self.player_left.speed * -1
-            self.player_left.position(move_player_px)
+        # Statt einer Surface pro Ball gibt es nur wenige vorgezeichnete Bilder
+        self.palette = [
+            BALL_IMAGES.get(
+                self.random.ball_color(),
+                self.ball_radius,
+                background_color,
+                self.size,
+            )
+            for _ in range(self.palette_size)
+        ]
+        self.color_index = self.random.generator.integers(0, self.palette_size, count)
 
-        if pygame.key.get_pressed()[pygame.K_s]:
-            move_player_px = self.player_left.speed
-            self.player_left.position(move_player_px)
+    @property
+    def active_count(self):
+        return int(np.count_nonzero(self.active))
 
-        if pygame.key.get_pressed()[pygame.K_UP]:
-            move_player_px = self.player_right.speed * -1
-            self.player_right.position(move_player_px)
+    def first_serve(self, center):
+        # Wie 'Ball.first_serve', nur für alle Bälle auf einmal
+        self.position[:, 0] = center[0] - self.size // 2
+        self.position[:, 1] = center[1] - self.size // 2
 
-        if pygame.key.get_pressed()[pygame.K_DOWN]:
-            move_player_px = self.player_right.speed
-            self.player_right.position(move_player_px)
+        direction, angle = self.random.serves(self.count)
+        self.speed[:, 0] = 5 * direction
+        self.speed[:, 1] = angle
+        self.active[:] = True
+        self._subpixel[:] = 0.0
 
-    def _reset_game(self):
-        self._position_ball()
-        self._position_players()
-        self.current_active_balls_on_field = self.max_active_balls_on_field
+    def _build_broad_phase(self, cell_size):
+        """
+        Sortiert alle Bälle nach der Gitterzelle ihrer linken oberen Ecke.
 
-    def _position_ball(self):
-        for ball in self.balls:
-            ball.rect.centerx = self.main_window.get_rect().centerx
-            ball.rect.centery = self.main_window.get_rect().centery
-            ball.first_serve()
+        Das ist die numpy Variante von 'SpatialHash': Die Bälle einer Spalte
+        des Gitters liegen nach dem Sortieren direkt hintereinander und
+        können mit 'np.searchsorted' gefunden werden.
+        """
+        cells = self.position.astype(np.int64) // cell_size
+        # Negative Zellen (Bälle im Aus) dürfen nicht in andere Spalten rutschen
+        self._cell_keys_offset = 1 << 15
+        keys = (cells[:, 0] + self._cell_keys_offset) * (1 << 16) + (
+            cells[:, 1] + self._cell_keys_offset
+        )
+        self._cell_order = np.argsort(keys, kind="stable")
+        self._sorted_cell_keys = keys[self._cell_order]
+        self._cell_size = cell_size
 
-    def _position_players(self):
-        move_px_from_wall = 50
+    def _candidates(self, rect):
+        """Indizes aller Bälle, die 'rect' berühren könnten."""
+        if self._cell_order is None:
+            return np.arange(self.count)
 
-        self.player_left.rect.centerx = (
-            self.main_window.get_rect().left + move_px_from_wall
-        )
+        # Ein Ball wird nach seiner linken oberen Ecke einsortiert. Deshalb
+        # wird der Suchbereich um die Ballgröße nach links und oben erweitert.
+        cell_size = self._cell_size
+        offset = self._cell_keys_offset
+        first_row = (rect.top - self.size) // cell_size + offset
+        last_row = (rect.bottom - 1) // cell_size + offset
 
-        self.player_right.rect.centerx = (
-            self.main_window.get_rect().right - move_px_from_wall
-        )
+        found = []
+        for column in range(
+            (rect.left - self.size) // cell_size + offset,
+            (rect.right - 1) // cell_size + offset + 1,
+        ):
+            low, high = np.searchsorted(
+                self._sorted_cell_keys,
+                [column * (1 << 16) + first_row, column * (1 << 16) + last_row + 1],
+            )
+            found.append(self._cell_order[low:high])
 
-        self.player_left.rect.centery = self.main_window.get_rect().centery
+        return np.concatenate(found)
 
-        self.player_right.rect.centery = self.main_window.get_rect().centery
+    def _collides_with(self, rect, candidates):
+        # Wie 'pygame.Rect.colliderect', nur für viele Bälle gleichzeitig
+        x = self.position[candidates, 0]
+        y = self.position[candidates, 1]
+        return candidates[
+            (x < rect.right)
+            & (rect.left < x + self.size)
+            & (y < rect.bottom)
+            & (rect.top < y + self.size)
+        ]
 
-    def _draw_scoreboard(self):
-        font_color = (255, 255, 255)
-        background_color = self.main_window_background_color
+    def step(self, field_rect, paddle_rects, obstacle_rects=(), cell_size=64, frames=1):
+        """
+        Bewegt alle aktiven Bälle um einen Schritt ('frames' Frames auf einmal).
 
-        font = pygame.font.SysFont("Consolas", 34)
+        Gibt zurück, welche Bälle links bzw. rechts ins Aus gegangen sind und
+        wie oft ein Schläger getroffen wurde.
+        """
+        x = self.position[:, 0]
+        y = self.position[:, 1]
 
-        # Google: Python f-string
-        scoreboard_text = f"Player A: {str(self.player_left.score)}"
+        right_wall_collision = self.active & (x + self.size > field_rect.right)
+        left_wall_collision = self.active & (x < field_rect.left)
+        out_of_field = right_wall_collision | left_wall_collision
 
-        scoreboard_player_a = font.render(
-            scoreboard_text,
-            True,
-            font_color,
-            background_color,
+        top_bot_wall_collision = (
+            self.active
+            & ~out_of_field
+            & ((y < field_rect.top) | (y + self.size > field_rect.bottom))
         )
 
-        score_board_rect_a = scoreboard_player_a.get_rect()
-        # Zentriert die Anzeige in der linken Hälfte
-        score_board_rect_a.x = int(self.main_window.get_rect().centerx / 2) - (
-            score_board_rect_a.centerx
-        )
-        score_board_rect_a.y = 20
+        # Jeder Schläger und jedes Hindernis wird nur mit den Bällen aus den
+        # umliegenden Gitterzellen verglichen. Das Sortieren lohnt sich aber
+        # erst ab einigen Objekten, bei zwei Schlägern ist es langsamer.
+        if len(paddle_rects) + len(obstacle_rects) > self.broad_phase_min_objects:
+            self._build_broad_phase(cell_size)
+        else:
+            self._cell_order = None
 
-        scoreboard_text = f"Player B: {str(self.player_right.score)}"
+        for obstacle in obstacle_rects:
+            self._bounce_off(obstacle, top_bot_wall_collision)
 
-        scoreboard_player_b = font.render(
-            scoreboard_text,
-            True,
-            font_color,
-            background_color,
-        )
+        self.active &= ~out_of_field
+        self.speed[out_of_field] = 0
 
-        score_board_rect_b = scoreboard_player_b.get_rect()
+        self.speed[top_bot_wall_collision, 1] *= -1
+
+        travel = self.speed * frames
+        if travel.dtype.kind == "f":
+            # 'position' speichert nur ganze Pixel, der Rest wird aufgehoben
+            travel += self._subpixel
+            whole_pixels = np.rint(travel)
+            self._subpixel = travel - whole_pixels
+            travel = whole_pixels.astype(np.int32)
+
+        hits, time_of_impact = self._sweep_paddles(paddle_rects, travel)
+
+        # Bälle ohne Treffer fliegen den ganzen Weg, getroffene Bälle nur bis
+        # zum Schläger und den Rest in die neue Richtung ('Matchfield._sweep_ball')
+        self.position += travel
+
+        if hits.size:
+            strike_balls(
+                self.position,
+                self.speed,
+                travel,
+                hits,
+                time_of_impact,
+                self.random.strike_angles(hits.size),
+                frames,
+            )
+
+        reflect_from_walls(
+            self.position,
+            self.speed,
+            self.active,
+            field_rect.top,
+            field_rect.bottom,
+            self.size,
+        )
+
+        return left_wall_collision, right_wall_collision, hits.size
+
+    def _sweep_paddles(self, paddle_rects, travel):
+        """
+        Sucht für alle Bälle den ersten Schläger auf ihrer Flugbahn.
+
+        Das ist die numpy Variante von 'swept_aabb': Es wird der Zeitpunkt
+        (0 bis 1) berechnet, an dem ein Ball den Schläger zum ersten Mal
+        berührt. Gibt die getroffenen Bälle und ihre Zeitpunkte zurück.
+        """
+        max_travel = (
+            (np.abs(travel[:, 0]).max(), np.abs(travel[:, 1]).max())
+            if self.count
+            else (0, 0)
+        )
+
+        time_of_impact = np.full(self.count, np.inf)
+        for paddle in paddle_rects:
+            # Der Suchbereich wird um die maximale Flugstrecke vergrößert
+            search_rect = paddle.inflate(2 * int(max_travel[0]), 2 * int(max_travel[1]))
+            candidates = self._path_candidates(search_rect, paddle, travel)
+
+            time_of_impact[candidates] = np.minimum(
+                time_of_impact[candidates],
+                paddle_impact_times(
+                    self.position[candidates],
+                    travel[candidates],
+                    self.size,
+                    paddle.left,
+                    paddle.top,
+                    paddle.right,
+                    paddle.bottom,
+                ),
+            )
+
+        hits = np.flatnonzero(np.isfinite(time_of_impact))
+        return hits, time_of_impact[hits]
+
+    def _path_candidates(self, search_rect, rect, travel):
+        """
+        Grober Vorfilter: Nur Bälle, deren gesamte Flugbahn 'rect' überhaupt
+        berühren kann, werden danach genauer untersucht.
+        """
+        if self._cell_order is None:
+            # Ohne Gitter zuerst nur die x-Achse aller Bälle prüfen. Die
+            # Schläger sind schmal, danach bleiben nur noch wenige Bälle übrig.
+            x = self.position[:, 0]
+            x_end = x + travel[:, 0]
+            candidates = np.flatnonzero(
+                (np.minimum(x, x_end) < rect.right)
+                & (np.maximum(x, x_end) + self.size > rect.left)
+            )
+        else:
+            candidates = self._candidates(search_rect)
+
+        x = self.position[candidates, 0]
+        y = self.position[candidates, 1]
+        x_end = x + travel[candidates, 0]
+        y_end = y + travel[candidates, 1]
+        on_path = (
+            self.active[candidates]
+            & (np.minimum(x, x_end) < rect.right)
+            & (np.maximum(x, x_end) + self.size > rect.left)
+            & (np.minimum(y, y_end) < rect.bottom)
+            & (np.maximum(y, y_end) + self.size > rect.top)
+        )
+        return candidates[on_path]
+
+    def _bounce_off(self, obstacle, already_handled):
+        hits = self._collides_with(obstacle, self._candidates(obstacle))
+        hits = hits[self.active[hits] & ~already_handled[hits]]
+        if not hits.size:
+            return
+
+        x = self.position[hits, 0]
+        y = self.position[hits, 1]
+        overlap_x = np.minimum(x + self.size, obstacle.right) - np.maximum(
+            x, obstacle.left
+        )
+        overlap_y = np.minimum(y + self.size, obstacle.bottom) - np.maximum(
+            y, obstacle.top
+        )
+
+        # Der Ball prallt an der Seite ab, an der er weniger tief eingedrungen
+        # ist, aber nur, wenn er sich noch auf das Hindernis zubewegt
+        speed = self.speed[hits]
+        towards_x = np.sign(obstacle.centerx - (x + self.size // 2)) == np.sign(
+            speed[:, 0]
+        )
+        towards_y = np.sign(obstacle.centery - (y + self.size // 2)) == np.sign(
+            speed[:, 1]
+        )
+        flip_x = (overlap_x < overlap_y) & towards_x
+        flip_y = (overlap_x >= overlap_y) & towards_y
+        speed[flip_x, 0] *= -1
+        speed[flip_y, 1] *= -1
+        self.speed[hits] = speed
+
+    def draw(self, surface, doreturn=False):
+        # 'Surface.blits' zeichnet alle Bälle mit einem einzigen Aufruf
+        active = np.flatnonzero(self.active)
+        palette = self.palette
+        return surface.blits(
+            [
+                (palette[color], position)
+                for color, position in zip(
+                    self.color_index[active].tolist(), self.position[active].tolist()
+                )
+            ],
+            doreturn=doreturn,
+        )
+
+
+def actions_to_input(actions):
+    """
+    Wandelt Aktionen in Eingabe-Bits um (auch für ganze numpy arrays).
+
+    Eine Aktion ist ein Paar (links, rechts) mit je -1 (hoch), 0 (stehen
+    bleiben) oder 1 (runter), z.B. [[0, 1], [-1, 0]] für zwei Schritte.
+    """
+    actions = np.asarray(actions)
+    left = actions[..., 0]
+    right = actions[..., 1]
+    return (
+        (left < 0) * INPUT_LEFT_UP
+        | (left > 0) * INPUT_LEFT_DOWN
+        | (right < 0) * INPUT_RIGHT_UP
+        | (right > 0) * INPUT_RIGHT_DOWN
+    ).astype(np.uint8)
+
+
+class KeyboardInput:
+    """
+    Liest die Tastatur einmal pro Physik-Schritt (ein 'snapshot').
+
+    'key_bindings' ordnet jedem Eingabe-Bit eine Taste zu. Ohne Angabe
+    gelten W/S für links und Pfeil hoch/runter für rechts.
+    """
+
+    def __init__(self, key_bindings=None):
+        self.key_bindings = key_bindings or {
+            INPUT_LEFT_UP: pygame.K_w,
+            INPUT_LEFT_DOWN: pygame.K_s,
+            INPUT_RIGHT_UP: pygame.K_UP,
+            INPUT_RIGHT_DOWN: pygame.K_DOWN,
+        }
+
+    def read(self, matchfield):
+        pressed = pygame.key.get_pressed()
+        input_bits = 0
+        for bit, key in self.key_bindings.items():
+            if pressed[key]:
+                input_bits |= bit
+        return input_bits
+
+
+class ActionArrayInput:
+    """
+    Spielt vorher festgelegte Eingaben Schritt für Schritt ab.
+
+    'inputs' sind entweder Eingabe-Bits (ein Wert pro Schritt) oder
+    Aktionen mit der Form (Schritte, 2), siehe 'actions_to_input'. Sind alle
+    Eingaben verbraucht, stehen die Schläger still.
+    """
+
+    def __init__(self, inputs):
+        inputs = np.asarray(inputs)
+        if inputs.ndim == 2:
+            inputs = actions_to_input(inputs)
+        self.inputs = inputs.astype(np.uint8)
+        self.index = 0
+
+    def read(self, matchfield):
+        if self.index >= len(self.inputs):
+            return 0
+        input_bits = int(self.inputs[self.index])
+        self.index += 1
+        return input_bits
+
+
+class ReplayInput(ActionArrayInput):
+    """Spielt die Eingaben einer Replay-Datei ('ReplayReader') erneut ab."""
+
+    def __init__(self, replay, start=0):
+        super().__init__(replay.frames["input"][start:])
+
+
+class ScriptedInput:
+    """
+    Eingaben von einem Programm, z.B. einem Bot:
+
+        ScriptedInput(lambda matchfield: INPUT_LEFT_UP)
+
+    Die Funktion bekommt das 'Matchfield' und gibt Eingabe-Bits zurück.
+    """
+
+    def __init__(self, script):
+        self.script = script
+
+    def read(self, matchfield):
+        return self.script(matchfield)
+
+
+class SplitInput:
+    """
+    Verschiedene Quellen für die beiden Schläger, z.B. links die Tastatur
+    und rechts ein Bot. Von jeder Quelle zählen nur die Bits ihrer Seite.
+    """
+
+    def __init__(self, left=None, right=None):
+        self.left = left
+        self.right = right
+
+    def read(self, matchfield):
+        input_bits = 0
+        if self.left is not None:
+            input_bits |= self.left.read(matchfield) & INPUT_LEFT
+        if self.right is not None:
+            input_bits |= self.right.read(matchfield) & INPUT_RIGHT
+        return input_bits
+
+
+def predict_crossing(x, y, speed_x, speed_y, target_x, field_height, ball_size):
+    """
+    Berechnet, wann und wo ein Ball die senkrechte Linie 'target_x' erreicht.
+
+    Statt die Flugbahn Schritt für Schritt nachzurechnen, wird das Spielfeld
+    an Ober- und Unterkante "aufgeklappt": Ohne Wände flöge der Ball einfach
+    geradeaus weiter. Die Abpraller ergeben dann eine Dreieckswelle
+    (Google: triangle wave, reflection unfolding):
+
+        y_ohne_wände = y + speed_y * frames
+        y_mit_wänden = L - |(y_ohne_wände mod 2L) - L|     mit L = Höhe - Ball
+
+    Der Aufwand ist immer gleich, egal wie weit der Ball noch entfernt ist.
+    Gibt (Frames bis dahin, y der Oberkante des Balles) zurück. Funktioniert
+    mit einfachen Zahlen und mit numpy arrays. 'speed_x' darf nicht 0 sein.
+    """
+    frames = (target_x - x) / speed_x
+    span = field_height - ball_size
+    unfolded = y + speed_y * frames
+    return frames, span - abs(unfolded % (2 * span) - span)
+
+
+def predict_paddle_target(
+    position, speed, active, side, paddle_edge, field_height, ball_size
+):
+    """
+    Mitte (y) des Balles, der als nächstes die Linie des Schlägers erreicht,
+    für numpy arrays mit den Bällen auf der letzten Achse, z.B. (Bälle, 2)
+    oder (Spiele, Bälle, 2). Kommt kein Ball auf den Schläger zu, ist das
+    Ergebnis die Mitte des Spielfeldes.
+
+    'paddle_edge' ist die Kante des Schlägers, die der Ball zuerst berührt.
+    """
+    speed_x = speed[..., 0]
+    if side == PlayerSide.LEFT:
+        approaching = active & (speed_x < 0)
+        target_x = paddle_edge
+    else:
+        approaching = active & (speed_x > 0)
+        target_x = paddle_edge - ball_size
+
+    frames, y = predict_crossing(
+        position[..., 0],
+        position[..., 1],
+        np.where(approaching, speed_x, 1),
+        speed[..., 1],
+        target_x,
+        field_height,
+        ball_size,
+    )
+    frames = np.where(approaching & (frames >= 0), frames, np.inf)
+
+    nearest = np.argmin(frames, axis=-1)[..., np.newaxis]
+    nearest_y = np.take_along_axis(y, nearest, axis=-1)[..., 0] + ball_size / 2
+    found = np.isfinite(np.take_along_axis(frames, nearest, axis=-1)[..., 0])
+    return np.where(found, nearest_y, field_height / 2)
+
+
+class TrajectoryBot:
+    """
+    Ein Computer-Gegner für eine Seite des Spielfeldes.
+
+    Der Bot berechnet mit 'predict_crossing', wo der nächste Ball die Linie
+    seines Schlägers kreuzt, und fährt den Schläger dorthin. Ist kein Ball
+    unterwegs zu ihm, kehrt er zur Mitte zurück. Innerhalb von 'dead_zone'
+    Pixeln bleibt er stehen, damit der Schläger nicht hin und her zittert.
+
+        matchfield.input_source = SplitInput(
+            left=TrajectoryBot(PlayerSide.LEFT),
+            right=TrajectoryBot(PlayerSide.RIGHT),
+        )
+    """
+
+    def __init__(self, side, dead_zone=4):
+        self.side = side
+        self.dead_zone = dead_zone
+        if side == PlayerSide.LEFT:
+            self.up, self.down = INPUT_LEFT_UP, INPUT_LEFT_DOWN
+        else:
+            self.up, self.down = INPUT_RIGHT_UP, INPUT_RIGHT_DOWN
+
+    def target_y(self, matchfield):
+        left = self.side == PlayerSide.LEFT
+        paddle = matchfield.player_left if left else matchfield.player_right
+        field_height = matchfield.main_window.get_height()
+
+        if matchfield.vectorized:
+            balls = matchfield.ball_arrays
+            return float(
+                predict_paddle_target(
+                    balls.position,
+                    balls.speed,
+                    balls.active,
+                    self.side,
+                    paddle.rect.right if left else paddle.rect.left,
+                    field_height,
+                    BallArrays.size,
+                )
+            )
+
+        # Bei wenigen Bällen sind einfache Python-Zahlen schneller als numpy
+        nearest = None
+        for ball in matchfield.balls:
+            speed_x, speed_y = ball.speed.tolist()
+            if (speed_x >= 0) if left else (speed_x <= 0):
+                continue
+
+            size = ball.rect.height
+            target_x = paddle.rect.right if left else paddle.rect.left - size
+            frames, y = predict_crossing(
+                ball.rect.x, ball.rect.y, speed_x, speed_y, target_x, field_height, size
+            )
+            if frames >= 0 and (nearest is None or frames < nearest[0]):
+                nearest = (frames, y + size / 2)
+
+        return field_height / 2 if nearest is None else nearest[1]
+
+    def read(self, matchfield):
+        paddle = (
+            matchfield.player_left
+            if self.side == PlayerSide.LEFT
+            else matchfield.player_right
+        )
+        distance = self.target_y(matchfield) - paddle.rect.centery
+        if distance < -self.dead_zone:
+            return self.up
+        if distance > self.dead_zone:
+            return self.down
+        return 0
+
+
+class Matchfield:
+    def __init__(
+        self,
+        main_window,
+        ball_count=3,
+        headless=False,
+        vectorized=None,
+        dirty_rects=False,
+        ball_collisions=False,
+        seed=None,
+    ):
+        self.main_window = main_window
+
+        # Mit einem festen 'seed' verläuft jedes Spiel exakt gleich
+        self.random = MatchRandom(seed)
+
+        # Bei sehr vielen Bällen wird mit numpy arrays statt Sprites gerechnet
+        if vectorized is None:
+            vectorized = ball_count >= VECTORIZED_BALL_THRESHOLD
+        if vectorized and ball_collisions:
+            # 'BallArrays' kennt keine Stöße der Bälle untereinander
+            raise ValueError(
+                f"ball_collisions geht nur mit Sprites (weniger als "
+                f"{VECTORIZED_BALL_THRESHOLD} Bälle oder vectorized=False)"
+            )
+        self.vectorized = vectorized
+
+        # Im 'headless' Modus wird nur die Spielphysik berechnet: kein Zeichnen,
+        # kein Sound und keine Tastatur (Google: headless software)
+        self.headless = headless
+
+        # Statt das ganze Fenster neu zu zeichnen, werden nur die Bereiche
+        # erneuert, die sich verändert haben (Google: pygame dirty rects)
+        self.dirty_rects = dirty_rects
+
+        # Das leere Spielfeld (Hintergrundfarbe und Mittellinie) wird nur
+        # einmal gezeichnet und danach in jedem Frame nur noch kopiert. Im
+        # 'headless' Modus entsteht es erst beim ersten 'render()', weil es
+        # so groß wie das ganze Fenster ist.
+        self._field_layer = None
+        self.background = None
+
+        if headless:
+            self.main_window_background_color = pygame.Color(FIELD_COLOR)
+        else:
+            # Google: Python Variable encapsulation
+            self._redraw_field()
+            self.main_window_background_color = main_window.get_at((0, 0))
+
+        self.max_active_balls_on_field = ball_count
+        self.current_active_balls_on_field = ball_count
+        if vectorized:
+            self.balls = []
+            self.ball_arrays = BallArrays(
+                ball_count, self.main_window_background_color, self.random
+            )
+        else:
+            self.balls = [
+                Ball(self.main_window_background_color, self.random)
+                for _ in range(0, ball_count)
+            ]
+            self.ball_arrays = None
+
+        self.player_left = Player(PlayerSide.LEFT)
+        self.player_right = Player(PlayerSide.RIGHT)
+
+        # Statistik: Schlägertreffer im laufenden Ballwechsel (engl. rally)
+        # und die Anzahl der Treffer aller beendeten Ballwechsel
+        self.rally_hits = 0
+        self.rallies = []
+
+        # Google: Python v
+        # ariable encapsulation
+        self._reset_game()
+
+        self.sounds = GameSounds("beep.wav", muted=headless)
+
+        # 'RenderUpdates' merkt sich, wo die Sprites gezeichnet wurden
+        if dirty_rects:
+            self.game_object_sprites = pygame.sprite.RenderUpdates()
+        else:
+            self.game_object_sprites = pygame.sprite.Group()
+        self.game_object_sprites.add(self.balls, self.player_left, self.player_right)
+
+        # Schläger, Hindernisse und (optional) Bälle werden in jedem Schritt
+        # in ein Gitter einsortiert, damit nur benachbarte Objekte auf eine
+        # Kollision geprüft werden müssen. Bei wenigen Objekten werden sie wie
+        # in 'BallArrays' direkt geprüft, siehe '_build_collision_grid'.
+        self.obstacles = []
+        self.ball_collisions = ball_collisions
+        self._collision_grid = SpatialHash(cell_size=64)
+        self._collision_targets = None
+
+        # Wie oft ein Ball innerhalb eines Schrittes höchstens abprallen kann
+        self.max_bounces_per_step = 4
+
+        # Wird von 'FixedTimestepLoop' eingeschaltet: Sprites werden dann
+        # zwischen zwei Physik-Schritten gezeichnet
+        self.interpolate = False
+        self._previous_positions = None
+
+        # Anzahl berechneter Physik-Schritte und letzte Eingabe der Spieler
+        self.ticks = 0
+        self.last_input = 0
+
+        # Woher die Eingaben für die Schläger kommen, z.B. 'KeyboardInput',
+        # 'ActionArrayInput' oder 'ScriptedInput'. Ohne Fenster gibt es keine
+        # Tastatur, die Schläger stehen dann still (None).
+        self.input_source = None if headless else KeyboardInput()
+
+        # Zeichnet jeden Physik-Schritt auf, siehe 'ReplayWriter'
+        self.recorder = None
+
+        # Misst die Dauer der einzelnen Phasen eines Frames, siehe 'FrameTimings'
+        self.timings = None
+
+        # Liest nach jedem gezeichneten Bild die Pixel aus, siehe
+        # 'FrameCapture' und 'VideoRecorder'
+        self.frame_capture = None
+        self.video_recorder = None
+
+        if not headless:
+            self._prepare_sprite_images()
+
+        self.debugger = None
+
+        # Die Anzeige wird nur neu erstellt, wenn sich ein Punktestand ändert
+        self._scoreboard_scores = None
+        self._scoreboard_surfaces = None
+
+        if dirty_rects:
+            self._full_redraw = True
+            self._ball_rects = []
+            self._debug_overlay_rect = None
+
+    def move_ball(self, ball, frames=1):
+        """
+        Bewegt einen einzelnen Ball. Schläger und Hindernisse werden dafür
+        erst in das Gitter einsortiert, 'step' macht das einmal für alle Bälle.
+        """
+        self._build_collision_grid()
+        self._move_ball(ball, frames)
+
+    def _move_ball(self, ball, frames=1):
+
+        """
+        |                     |   Der Ausdruck auf der rechten Seite gibt einen booleschen
+        |  <------ ° ------>  |   Wert zurück (True/False). Dieser Zeigt an, ob der Ball
+        |                     |   die rechte oder linke Wand berührt hat.
+        """
+        field_rect = self.main_window.get_rect()
+        right_wall_collision = field_rect.right < ball.rect.right
+        left_wall_collision = field_rect.left > ball.rect.left
+
+        """
+        _________.______________   Hier gilt wie oben beschrieben, die gleiche Logik.
+        .      .  . ^              Diesmal wird jedoch geschaut, ob der Ball über
+         .    .     °              Bande gespielt wurde.
+          .  .      v              Dadurch wird der y-Wert in der 'Ball.speed' Variable
+        ____.___________________   mit -1 multiplizert (Vorzeichen wird umgekehrt).
+        """
+        top_wall_collision = field_rect.top > ball.rect.top
+        bottom_wall_collision = field_rect.bottom < ball.rect.bottom
+
+        # Hier werden die Teilergebnise aus den beiden oberen Ausdrücken
+        # zu einem Ergebnis durch ein OR zusammengefasst
+        # Google: Logikgatter
+        top_bot_wall_collision = top_wall_collision or bottom_wall_collision
+
+        if right_wall_collision:
+            self.current_active_balls_on_field -= 1
+            ball.remove_from_match()
+
+            if self.current_active_balls_on_field == 0:
+                self.player_left.score += 1
+                self._finish_rally()
+                self._reset_game()
+
+        elif left_wall_collision:
+            self.current_active_balls_on_field -= 1
+            ball.remove_from_match()
+
+            if self.current_active_balls_on_field == 0:
+                self.player_right.score += 1
+                self._finish_rally()
+                self._reset_game()
+
+        elif top_bot_wall_collision:
+            ball.speed *= np.array([1, -1])
+
+        self._sweep_ball(ball, field_rect, frames)
+
+    def _strike_ball(self, ball):
+        # Falls der Ball einen Schläger trifft, soll sich die "Flugrichtung" des Balles
+        # umkehren. Das beudetet, wir multiplizieren diesmal den x-Wert der Variable
+        # 'Ball.speed'.
+        self.sounds.play_pong_sound()
+        self.rally_hits += 1
+
+        # Google: Ternary Operator
+        y_angle_sign = np.sign(ball.speed[1]) if np.sign(ball.speed[1]) else 1
+
+        strike_angle = self.random.strike_angle()
+
+        ball.speed[0] += 1 * np.sign(ball.speed[0])
+        ball.speed[0] *= -1
+        ball.speed[1] = strike_angle * y_angle_sign
+
+    def _sweep_ball(self, ball, field_rect, frames=1):
+        """
+        Bewegt den Ball und prüft dabei die gesamte Flugbahn auf Kollisionen.
+
+        Statt nur nachzusehen, ob sich Ball und Schläger nach der Bewegung
+        überlappen, wird der Zeitpunkt berechnet, an dem der Ball ein Objekt
+        zum ersten Mal berührt (Google: swept AABB, time of impact). Dort
+        prallt er ab und fliegt den Rest des Schrittes in die neue Richtung.
+        So kann ein schneller Ball nicht mehr durch einen Schläger "tunneln"
+        und es können auch mehrere Frames auf einmal berechnet werden.
+        """
+        remaining = 1.0
+        for _ in range(self.max_bounces_per_step):
+            # Einfache Python-Zahlen sind hier deutlich schneller als numpy
+            speed_x, speed_y = ball.speed.tolist()
+            travel = (speed_x * frames * remaining, speed_y * frames * remaining)
+            path = ball.rect.union(ball.rect.move(round(travel[0]), round(travel[1])))
+
+            # Nur Objekte aus den Gitterzellen entlang der Flugbahn prüfen
+            candidates = self._collision_targets
+            if candidates is None:
+                candidates = self._collision_grid.query(path)
+            else:
+                # Ohne Gitter nur Objekte in der Nähe der Flugbahn prüfen. Der
+                # zusätzliche Pixel gleicht das Runden von 'travel' aus.
+                reach = path.inflate(2, 2)
+                candidates = [
+                    game_object
+                    for game_object in candidates
+                    if reach.colliderect(game_object.rect)
+                ]
+            targets = [
+                (game_object.rect, game_object)
+                for game_object in candidates
+                if not isinstance(game_object, Ball)
+            ]
+
+            # Ober- und Unterkante des Spielfeldes als Wände außerhalb des
+            # Feldes, aber nur, wenn die Flugbahn das Feld verlässt
+            if path.top < field_rect.top:
+                targets.append((field_rect.move(0, -field_rect.height), None))
+            if path.bottom > field_rect.bottom:
+                targets.append((field_rect.move(0, field_rect.height), None))
+
+            impact = None
+            for target_rect, game_object in targets:
+                hit = swept_aabb(ball.rect, travel, target_rect)
+                if hit is None:
+                    continue
+
+                time_of_impact, axis = hit
+                # Schläger werfen den Ball immer in x-Richtung zurück
+                if isinstance(game_object, Player):
+                    axis = 0
+                if not _moves_towards(ball.rect, travel, target_rect, axis):
+                    continue
+
+                if impact is None or time_of_impact < impact[0]:
+                    impact = (time_of_impact, axis, game_object)
+
+            if impact is None:
+                ball.move_by(travel)
+                return
+
+            time_of_impact, axis, game_object = impact
+            ball.move_by((travel[0] * time_of_impact, travel[1] * time_of_impact))
+
+            if isinstance(game_object, Player):
+                self._strike_ball(ball)
+            else:
+                ball.speed[axis] *= -1
+
+            remaining *= 1.0 - time_of_impact
+            if remaining <= 0.0:
+                return
+
+    def add_obstacle(self, rect):
+        obstacle = Obstacle(rect)
+        if not self.headless:
+            obstacle.image = prepare_surface(obstacle.image)
+
+        self.obstacles.append(obstacle)
+        self.game_object_sprites.add(obstacle)
+        return obstacle
+
+    def _build_collision_grid(self):
+        game_objects = (self.player_left, self.player_right, *self.obstacles)
+
+        # Das Einsortieren lohnt sich erst ab einigen Objekten, bei zwei
+        # Schlägern ist es langsamer, als jeden Schläger direkt zu prüfen
+        if (
+            not self.ball_collisions
+            and len(game_objects) <= BallArrays.broad_phase_min_objects
+        ):
+            self._collision_targets = game_objects
+            return
+
+        self._collision_targets = None
+        grid = self._collision_grid
+        grid.clear()
+
+        for game_object in game_objects:
+            grid.insert(game_object, game_object.rect)
+
+        if self.ball_collisions:
+            for ball in self.balls:
+                if ball.speed.any():
+                    grid.insert(ball, ball.rect)
+
+    def _resolve_ball_contacts(self):
+        """
+        Stoßen zwei Bälle zusammen, tauschen sie ihre Geschwindigkeiten
+        (Google: elastischer Stoß bei gleicher Masse).
+        """
+        for ball in self.balls:
+            if not ball.speed.any():
+                continue
+
+            for other in self._collision_grid.query(ball.rect):
+                # Jedes Paar nur einmal und nur Bälle untereinander betrachten
+                if not isinstance(other, Ball) or id(other) <= id(ball):
+                    continue
+                if not ball.rect.colliderect(other.rect):
+                    continue
+
+                # Nur Bälle, die sich aufeinander zubewegen, prallen ab
+                offset = np.array(other.rect.center) - np.array(ball.rect.center)
+                if np.dot(other.speed - ball.speed, offset) < 0:
+                    ball.speed, other.speed = other.speed.copy(), ball.speed.copy()
+
+    def move_balls_vectorized(self, frames=1):
+        field_rect = self.main_window.get_rect()
+        paddle_rects = (self.player_left.rect, self.player_right.rect)
+
+        obstacle_rects = [obstacle.rect for obstacle in self.obstacles]
+
+        was_active = self.current_active_balls_on_field
+        left_out, right_out, paddle_hits = self.ball_arrays.step(
+            field_rect,
+            paddle_rects,
+            obstacle_rects,
+            self._collision_grid.cell_size,
+            frames,
+        )
+
+        if paddle_hits:
+            self.sounds.play_pong_sound()
+            self.rally_hits += paddle_hits
+
+        self.current_active_balls_on_field = self.ball_arrays.active_count
+
+        if was_active and self.current_active_balls_on_field == 0:
+            # Den Punkt bekommt, wer den letzten Ball ins Aus gespielt hat.
+            # Wie in 'move_ball' zählt dabei der Ball mit dem höchsten Index.
+            last_ball = np.flatnonzero(left_out | right_out)[-1]
+            if right_out[last_ball]:
+                self.player_left.score += 1
+            else:
+                self.player_right.score += 1
+            self._finish_rally()
+            self._reset_game()
+
+    def ball_debug_state(self, index=0):
+        """Gibt (x, y, Speed, Winkel) eines Balles für den 'Debugger' zurück."""
+        if self.vectorized:
+            x, y = self.ball_arrays.position[index] + BallArrays.size // 2
+            speed = self.ball_arrays.speed[index]
+        else:
+            ball = self.balls[index]
+            x, y = ball.rect.centerx, ball.rect.centery
+            speed = ball.speed
+
+        return int(x), int(y), int(speed[0]), int(speed[1])
+
+    def move_player(self, frames=1):
+        """Fragt die Eingabequelle einmal ab und bewegt die Schläger."""
+        self.apply_input(self.input_source.read(self), frames)
+
+    def apply_input(self, input_bits, frames=1):
+        """Bewegt die Schläger anhand der Eingabe-Bits ('INPUT_LEFT_UP' usw.)."""
+        self.last_input = input_bits
+
+        if input_bits & INPUT_LEFT_UP:
+            move_player_px = self.player_left.speed * -1 * frames
+            self.player_left.position(move_player_px)
+
+        if input_bits & INPUT_LEFT_DOWN:
+            move_player_px = self.player_left.speed * frames
+            self.player_left.position(move_player_px)
+
+        if input_bits & INPUT_RIGHT_UP:
+            move_player_px = self.player_right.speed * -1 * frames
+            self.player_right.position(move_player_px)
+
+        if input_bits & INPUT_RIGHT_DOWN:
+            move_player_px = self.player_right.speed * frames
+            self.player_right.position(move_player_px)
+
+    def ball_state(self):
+        """Position (linke obere Ecke), Geschwindigkeit und Status aller Bälle."""
+        if self.vectorized:
+            return (
+                self.ball_arrays.position,
+                self.ball_arrays.speed,
+                self.ball_arrays.active,
+            )
+
+        # Listen statt numpy arrays, das ist bei wenigen Bällen schneller.
+        # Bälle im Aus stehen still ('Ball.remove_from_match').
+        position = [ball.rect.topleft for ball in self.balls]
+        speed = [ball.speed for ball in self.balls]
+        active = [ball.speed[0] != 0 or ball.speed[1] != 0 for ball in self.balls]
+        return position, speed, active
+
+    def set_ball_state(self, position, speed, active):
+        if self.vectorized:
+            self.ball_arrays.position[:] = position
+            self.ball_arrays.speed[:] = speed
+            self.ball_arrays.active[:] = active
+        else:
+            for ball, ball_position, ball_speed in zip(self.balls, position, speed):
+                ball.rect.topleft = (int(ball_position[0]), int(ball_position[1]))
+                ball.speed = np.array(ball_speed, dtype=np.int64)
+
+        self.current_active_balls_on_field = int(np.count_nonzero(active))
+
+    def _finish_rally(self):
+        self.rallies.append(self.rally_hits)
+        self.rally_hits = 0
+
+    def _reset_game(self):
+        self._position_ball()
+        self._position_players()
+        self.current_active_balls_on_field = self.max_active_balls_on_field
+
+    def _position_ball(self):
+        if self.vectorized:
+            self.ball_arrays.first_serve(self.main_window.get_rect().center)
+            return
+
+        for ball in self.balls:
+            ball.rect.centerx = self.main_window.get_rect().centerx
+            ball.rect.centery = self.main_window.get_rect().centery
+            ball.first_serve()
+
+    def _position_players(self):
+        move_px_from_wall = 50
+
+        self.player_left.rect.centerx = (
+            self.main_window.get_rect().left + move_px_from_wall
+        )
+
+        self.player_right.rect.centerx = (
+            self.main_window.get_rect().right - move_px_from_wall
+        )
+
+        self.player_left.rect.centery = self.main_window.get_rect().centery
+
+        self.player_right.rect.centery = self.main_window.get_rect().centery
+
+    def _draw_scoreboard(self):
+        scores = (self.player_left.score, self.player_right.score)
+        if scores != self._scoreboard_scores:
+            self._scoreboard_surfaces = self._render_scoreboard()
+            self._scoreboard_scores = scores
+
+        for scoreboard, scoreboard_rect in self._scoreboard_surfaces:
+            self.main_window.blit(scoreboard, scoreboard_rect)
+
+    def _render_scoreboard(self):
+        font_color = (255, 255, 255)
+        background_color = self.main_window_background_color
+
+        font = FONTS.get("Consolas", 34)
+
+        # Google: Python f-string
+        scoreboard_text = f"Player A: {str(self.player_left.score)}"
+
+        scoreboard_player_a = font.render(
+            scoreboard_text,
+            True,
+            font_color,
+            background_color,
+        )
+
+        score_board_rect_a = scoreboard_player_a.get_rect()
+        # Zentriert die Anzeige in der linken Hälfte
+        score_board_rect_a.x = int(self.main_window.get_rect().centerx / 2) - (
+            score_board_rect_a.centerx
+        )
+        score_board_rect_a.y = 20
+
+        scoreboard_text = f"Player B: {str(self.player_right.score)}"
+
+        scoreboard_player_b = font.render(
+            scoreboard_text,
+            True,
+            font_color,
+            background_color,
+        )
+
+        score_board_rect_b = scoreboard_player_b.get_rect()
         # Zentriert die Anzeige in der rechten Hälfte
         score_board_rect_b.x = int(self.main_window.get_rect().centerx) + (
             score_board_rect_b.centerx
         )
-        score_board_rect_b.y = 20
+        score_board_rect_b.y = 20
+
+        return [
+            (scoreboard_player_a, score_board_rect_a),
+            (scoreboard_player_b, score_board_rect_b),
+        ]
+
+    def _build_field_layer(self):
+        field_layer = pygame.Surface(self.main_window.get_size())
+
+        # Google: Hex Color Picker
+        # Farbzusammenstellung: Rot, Grün, Blau (Werte zwischen 0 und 255)
+        field_layer.fill(FIELD_COLOR)
+
+        # Gestrichelte Mittellinie
+        center_line_color = (60, 100, 145)
+        field_rect = field_layer.get_rect()
+        for y in range(0, field_rect.height, 35):
+            dash = pygame.Rect(0, y, 4, 20)
+            dash.centerx = field_rect.centerx
+            field_layer.fill(center_line_color, dash)
+
+        return prepare_surface(field_layer)
+
+    def _prepare_sprite_images(self):
+        # Die Bilder der Bälle kommen bereits umgewandelt aus 'BALL_IMAGES'
+        for player in (self.player_left, self.player_right):
+            player.image = prepare_surface(player.image)
+
+    def _get_field_layer(self):
+        if self._field_layer is None:
+            self._field_layer = self._build_field_layer()
+            if self.dirty_rects:
+                # Spielfeld mit Punkteanzeige. Aus dem Hintergrund werden die
+                # Stellen wiederhergestellt, an denen sich vorher ein Sprite befand.
+                self.background = self._field_layer.copy()
+        return self._field_layer
+
+    def _redraw_field(self):
+        self.main_window.blit(self._get_field_layer(), (0, 0))
+
+    def step(self, frames=1):
+        """
+        Berechnet einen Physik-Schritt, ohne etwas zu zeichnen.
+
+        Mit 'frames' > 1 werden mehrere Frames in einem einzigen Schritt
+        berechnet. Das geht, weil Kollisionen entlang der ganzen Flugbahn
+        gesucht werden (siehe '_sweep_ball'). 'frames' darf auch eine
+        Kommazahl sein, z.B. 0.25 bei einer Physik mit 240 Hz.
+        """
+        timings = self.timings
+        if timings is not None:
+            timings.start()
+
+        if self.interpolate:
+            self._remember_positions()
+
+        if self.vectorized:
+            self.move_balls_vectorized(frames)
+        else:
+            self._build_collision_grid()
+            if self.ball_collisions:
+                self._resolve_ball_contacts()
+
+            for ball in self.balls:
+                self._move_ball(ball, frames)
+
+        if timings is not None:
+            timings.lap("ball_movement")
+
+        if self.input_source is not None:
+            self.move_player(frames)
+            if timings is not None:
+                timings.lap("input")
+
+        self.ticks += 1
+        if self.recorder is not None:
+            self.recorder.record(self)
+
+    def run_match(self):
+        self.step()
+
+        if not self.headless:
+            self.render()
+        elif self.timings is not None:
+            self.timings.end_frame()
+
+    def render(self, alpha=1.0):
+        """
+        Zeichnet den aktuellen Zustand des Spielfeldes.
+
+        'alpha' (0 bis 1) gibt an, wie weit die Zeit schon zwischen dem
+        vorletzten und dem letzten Physik-Schritt fortgeschritten ist. Die
+        Sprites werden dann zwischen beiden Positionen gezeichnet
+        (Google: interpolation fixed timestep).
+        """
+        # Die Musik startet, sobald sie im Hintergrund fertig geladen ist,
+        # egal ob lokal, im Netzwerk oder als Zuschauer gespielt wird
+        self.sounds.update()
+
+        if self.timings is not None:
+            self.timings.start()
+
+        self._get_field_layer()
+
+        with self._interpolated_positions(alpha):
+            if self.dirty_rects:
+                self._render_dirty()
+            else:
+                self._render_full()
+
+        if self.frame_capture is not None:
+            self.frame_capture.capture()
+        if self.video_recorder is not None:
+            self.video_recorder.record()
+
+        if self.timings is not None:
+            self.timings.end_frame()
+
+    def _lap(self, phase):
+        if self.timings is not None:
+            self.timings.lap(phase)
+
+    def _render_full(self):
+        self._redraw_field()  # Sollte zu Anfang der 'Game-Loop' stehen
+        self._lap("field_redraw")
+
+        self._draw_scoreboard()
+        self._lap("scoreboard")
+
+        self.game_object_sprites.draw(self.main_window)
+        if self.vectorized:
+            self.ball_arrays.draw(self.main_window)
+        self._lap("sprite_draw")
+
+        self._draw_debugger()
+        self._lap("debugger")
+
+        # Erneuert das gesamte Fenster mit den bewegten Sprites, Fonts etc.
+        pygame.display.flip()  # Sollte zum Ende der 'Game-Loop' stehen
+        self._lap("display_flip")
+
+    def _remember_positions(self):
+        # Positionen vor dem Physik-Schritt, für das Zeichnen mit 'alpha'
+        if self.vectorized:
+            self._previous_ball_positions = self.ball_arrays.position.copy()
+        self._previous_positions = [
+            (sprite, sprite.rect.topleft)
+            for sprite in (*self.balls, self.player_left, self.player_right)
+        ]
+
+    @contextmanager
+    def _interpolated_positions(self, alpha):
+        if not self.interpolate or alpha >= 1.0 or self._previous_positions is None:
+            yield
+            return
+
+        # Sprünge (z.B. nach einem Punkt zurück in die Mitte) nicht interpolieren
+        max_jump = self.main_window.get_width() // 4
+
+        current_positions = []
+        for sprite, (previous_x, previous_y) in self._previous_positions:
+            x, y = sprite.rect.topleft
+            current_positions.append((sprite, (x, y)))
+            if abs(x - previous_x) + abs(y - previous_y) < max_jump:
+                sprite.rect.topleft = (
+                    round(previous_x + (x - previous_x) * alpha),
+                    round(previous_y + (y - previous_y) * alpha),
+                )
+
+        if self.vectorized:
+            current = self.ball_arrays.position
+            previous = self._previous_ball_positions
+            jumped = np.abs(current - previous).sum(axis=1) >= max_jump
+            interpolated = np.rint(previous + (current - previous) * alpha).astype(
+                np.int32
+            )
+            interpolated[jumped] = current[jumped]
+            self.ball_arrays.position = interpolated
+
+        try:
+            yield
+        finally:
+            for sprite, position in current_positions:
+                sprite.rect.topleft = position
+            if self.vectorized:
+                self.ball_arrays.position = current
+
+    def _draw_debugger(self):
+        """Zeichnet die Debug-Anzeige und gibt ihren Bereich zurück (oder None)."""
+        if self.debugger is None or not self.debugger.showOnScreen:
+            return None
+
+        self.debugger.show_fps()
+        self.debugger.show_coords()
+        self.debugger.show_paddle_coord()
+        self.debugger.show_music()
+        self.debugger.show_active_balls()
+        self.debugger.show_version()
+        self.debugger.show_frame_times()
+        self.debugger.draw()
+        return self.debugger.overlay_rect()
+
+    def _update_scoreboard_background(self):
+        """
+        Zeichnet die Punkteanzeige in den Hintergrund, falls sich ein
+        Punktestand geändert hat. Gibt die veränderten Bereiche zurück.
+        """
+        scores = (self.player_left.score, self.player_right.score)
+        if scores == self._scoreboard_scores:
+            return []
+
+        changed = []
+        if self._scoreboard_surfaces is not None:
+            for _, old_rect in self._scoreboard_surfaces:
+                self.background.blit(self._field_layer, old_rect, old_rect)
+                changed.append(old_rect)
+
+        self._scoreboard_surfaces = self._render_scoreboard()
+        self._scoreboard_scores = scores
+
+        for scoreboard, scoreboard_rect in self._scoreboard_surfaces:
+            self.background.blit(scoreboard, scoreboard_rect)
+            changed.append(scoreboard_rect)
+
+        return changed
+
+    def _render_dirty(self):
+        window = self.main_window
+        dirty = []
+
+        # 1. Alte Positionen der Sprites mit dem Hintergrund übermalen
+        self.game_object_sprites.clear(window, self.background)
+
+        if self.vectorized:
+            for rect in self._ball_rects:
+                window.blit(self.background, rect, rect)
+            dirty.extend(self._ball_rects)
+
+        if self._debug_overlay_rect is not None:
+            rect = self._debug_overlay_rect
+            window.blit(self.background, rect, rect)
+            dirty.append(rect)
+
+        if self._full_redraw:
+            window.blit(self.background, (0, 0))
+        self._lap("field_redraw")
+
+        # 2. Veränderte Punkteanzeige und Sprites an neuer Position zeichnen
+        for rect in self._update_scoreboard_background():
+            window.blit(self.background, rect, rect)
+            dirty.append(rect)
+        self._lap("scoreboard")
+
+        dirty.extend(self.game_object_sprites.draw(window))
+        if self.vectorized:
+            self._ball_rects = self.ball_arrays.draw(window, doreturn=True)
+            dirty.extend(self._ball_rects)
+        self._lap("sprite_draw")
+
+        self._debug_overlay_rect = self._draw_debugger()
+        if self._debug_overlay_rect is not None:
+            dirty.append(self._debug_overlay_rect)
+        self._lap("debugger")
+
+        # 3. Nur die veränderten Bereiche an den Bildschirm schicken
+        if self._full_redraw:
+            pygame.display.flip()
+            self._full_redraw = False
+        else:
+            pygame.display.update(dirty)
+        self._lap("display_flip")
+
+
+class MatchBatch:
+    """
+    Viele unabhängige Spiele, die im Gleichschritt berechnet werden.
+
+    Jedes Spiel entspricht einem 'Matchfield' im 'headless' Modus. Alle
+    Zustände liegen in numpy arrays mit einer zusätzlichen Spiel-Achse
+    (engl. match axis) vorne:
+
+        ball_position[Spiel, Ball, x/y]
+        score[Spiel, links/rechts]
+
+    So wird pro Schritt nur einmal durch Python gegangen, egal ob 1 oder
+    10.000 Spiele gleichzeitig laufen (Google: Monte-Carlo-Simulation).
+    """
+
+    ball_size = BallArrays.size
+    paddle_size = (10, 100)  # wie in 'Player'
+    paddle_distance = 50  # Abstand der Schläger zur Wand, wie in '_position_players'
+    paddle_speed = 8  # wie in 'Player'
+
+    def __init__(
+        self,
+        match_count,
+        ball_count=3,
+        window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+        points_to_win=None,
+        seed=None,
+    ):
+        self.match_count = match_count
+        self.random = MatchRandom(seed)
+        self.ball_count = ball_count
+        self.width, self.height = window_size
+        self.points_to_win = points_to_win
+
+        shape = (match_count, ball_count)
+        self.ball_position = np.zeros(shape + (2,), dtype=np.int32)
+        self.ball_speed = np.zeros(shape + (2,), dtype=np.int32)
+        self.ball_active = np.zeros(shape, dtype=bool)
+        self._travel = np.zeros(shape + (2,), dtype=np.int32)
+
+        # Spalte 0: linker Spieler ('Player A'), Spalte 1: rechter Spieler ('Player B')
+        self.score = np.zeros((match_count, 2), dtype=np.int32)
+        self.paddle_hits = np.zeros(match_count, dtype=np.int64)
+        self.frames = np.zeros(match_count, dtype=np.int64)
+        self.finished = np.zeros(match_count, dtype=bool)
+
+        # Die Schläger bewegen sich nur auf der y-Achse
+        paddle_width, paddle_height = self.paddle_size
+        left_x = self.paddle_distance - paddle_width // 2
+        right_x = self.width - self.paddle_distance - paddle_width // 2
+        self.paddle_x = np.array([left_x, right_x], dtype=np.int32)
+        self.paddle_y = np.zeros((match_count, 2), dtype=np.int32)
+
+        # Spalten (0 links, 1 rechts), deren Schläger in 'step' wie ein
+        # 'TrajectoryBot' fahren. Wie im 'Matchfield' sieht der Bot dabei
+        # schon die Bälle nach der Bewegung.
+        self.bot_columns = ()
+
+        self.reset(np.ones(match_count, dtype=bool))
+
+    @property
+    def active_balls(self):
+        return np.count_nonzero(self.ball_active, axis=1)
+
+    def reset(self, matches):
+        """Setzt Bälle und Schläger der ausgewählten Spiele zurück ('_reset_game')."""
+        count = int(np.count_nonzero(matches))
+        if count == 0:
+            return
+
+        self.ball_position[matches, :, 0] = self.width // 2 - self.ball_size // 2
+        self.ball_position[matches, :, 1] = self.height // 2 - self.ball_size // 2
+
+        # Aufschlag wie in 'Ball.first_serve'
+        serve_shape = (count, self.ball_count)
+        speed = np.empty(serve_shape + (2,), dtype=np.int32)
+        direction, angle = self.random.serves(count * self.ball_count)
+        speed[..., 0] = 5 * direction.reshape(serve_shape)
+        speed[..., 1] = angle.reshape(serve_shape)
+        self.ball_speed[matches] = speed
+        self.ball_active[matches] = True
+
+        self.paddle_y[matches] = self.height // 2 - self.paddle_size[1] // 2
+
+    def step(self, actions=None, frames=1):
+        """
+        Berechnet einen Physik-Schritt für alle laufenden Spiele.
+
+        'actions' bewegt die Schläger ohne Tastatur: ein array der Form
+        (Spiele, 2) mit -1 (hoch), 0 oder 1 (runter) für links und rechts.
+        Mit 'frames' > 1 (nur ganze Zahlen) werden mehrere Frames in einem
+        Schritt berechnet, wie in 'Matchfield.step'.
+        """
+        running = ~self.finished
+        active = self.ball_active & running[:, np.newaxis]
+
+        x = self.ball_position[..., 0]
+        y = self.ball_position[..., 1]
+        size = self.ball_size
+
+        right_wall_collision = active & (x + size > self.width)
+        left_wall_collision = active & (x < 0)
+        out_of_field = right_wall_collision | left_wall_collision
+
+        top_bot_wall_collision = (
+            active & ~out_of_field & ((y < 0) | (y + size > self.height))
+        )
+
+        was_active = np.count_nonzero(active, axis=1)
+        self.ball_active &= ~out_of_field
+        active &= ~out_of_field
+        self.ball_speed[out_of_field] = 0
+
+        self.ball_speed[..., 1][top_bot_wall_collision] *= -1
+
+        # Wie in 'BallArrays.step': Kollisionen mit den Schlägern werden
+        # entlang der ganzen Flugbahn gesucht, damit schnelle Bälle nicht
+        # durch einen Schläger "tunneln"
+        travel = self._travel
+        np.multiply(self.ball_speed, frames, out=travel)
+        time_of_impact = self._paddle_impact_times(active, travel)
+        hits = np.nonzero(np.isfinite(time_of_impact))
+
+        self.ball_position += travel
+
+        if hits[0].size:
+            strike_balls(
+                self.ball_position,
+                self.ball_speed,
+                travel,
+                hits,
+                time_of_impact[hits],
+                self.random.strike_angles(hits[0].size),
+                frames,
+            )
+            self.paddle_hits += np.bincount(hits[0], minlength=self.match_count)
+
+        reflect_from_walls(
+            self.ball_position, self.ball_speed, self.ball_active, 0, self.height, size
+        )
+
+        self.frames += running * frames
+
+        self._score_points(was_active, left_wall_collision, right_wall_collision)
+
+        if self.bot_columns:
+            bot_actions = self.bot_actions()
+            if actions is None:
+                actions = np.zeros_like(bot_actions)
+            else:
+                actions = np.array(actions, dtype=np.int32)
+            for column in self.bot_columns:
+                actions[:, column] = bot_actions[:, column]
+
+        # Wie in 'Matchfield.step' bewegen sich die Schläger nach den Bällen,
+        # also auch erst nach dem Zurücksetzen bei einem Punkt
+        if actions is not None:
+            move = np.asarray(actions, dtype=np.int32) * (self.paddle_speed * frames)
+            self.paddle_y += move * running[:, np.newaxis]
+
+    def _score_points(self, was_active, left_wall_collision, right_wall_collision):
+        point_scored = (was_active > 0) & ~self.ball_active.any(axis=1)
+        if not point_scored.any():
+            return
+
+        # Wie in 'Matchfield.move_ball' bekommt den Punkt, wer den Ball mit dem
+        # höchsten Index als letzten ins Aus gespielt hat.
+        out_of_field = (left_wall_collision | right_wall_collision)[point_scored]
+        last_ball = self.ball_count - 1 - np.argmax(out_of_field[:, ::-1], axis=1)
+        scored_right = right_wall_collision[point_scored, last_ball]
+
+        matches = np.flatnonzero(point_scored)
+        self.score[matches[scored_right], 0] += 1
+        self.score[matches[~scored_right], 1] += 1
+
+        if self.points_to_win is not None:
+            self.finished |= self.score.max(axis=1) >= self.points_to_win
+
+        self.reset(point_scored & ~self.finished)
+
+    def _paddle_impact_times(self, active, travel):
+        """
+        'paddle_impact_times' für alle Bälle aller Spiele. Genauer gerechnet
+        wird nur für Bälle, deren Flugbahn auf der x-Achse einen Schläger
+        kreuzt, das sind in jedem Schritt nur wenige.
+        """
+        time_of_impact = np.full(active.shape, np.inf)
+        paddle_width, paddle_height = self.paddle_size
+        x = self.ball_position[..., 0]
+        x_end = x + travel[..., 0]
+
+        for side in range(2):
+            left = self.paddle_x[side]
+            candidates = np.nonzero(
+                active
+                & (np.minimum(x, x_end) < left + paddle_width)
+                & (np.maximum(x, x_end) + self.ball_size > left)
+            )
+            if not candidates[0].size:
+                continue
+
+            top = self.paddle_y[candidates[0], side]
+            time_of_impact[candidates] = np.minimum(
+                time_of_impact[candidates],
+                paddle_impact_times(
+                    self.ball_position[candidates],
+                    travel[candidates],
+                    self.ball_size,
+                    left,
+                    top,
+                    left + paddle_width,
+                    top + paddle_height,
+                ),
+            )
+
+        return time_of_impact
+
+    def bot_actions(self, dead_zone=4):
+        """
+        Aktionen für 'step', bei denen beide Schläger aller Spiele wie ein
+        'TrajectoryBot' dem nächsten Ball entgegenfahren.
+        """
+        paddle_width, paddle_height = self.paddle_size
+        paddle_center = self.paddle_y + paddle_height // 2
+        actions = np.zeros((self.match_count, 2), dtype=np.int32)
+
+        edges = (self.paddle_x[0] + paddle_width, self.paddle_x[1])
+        for column, (side, edge) in enumerate(zip(PlayerSide, edges)):
+            target = predict_paddle_target(
+                self.ball_position,
+                self.ball_speed,
+                self.ball_active,
+                side,
+                edge,
+                self.height,
+                self.ball_size,
+            )
+            distance = target - paddle_center[:, column]
+            actions[:, column] = np.where(
+                np.abs(distance) > dead_zone, np.sign(distance), 0
+            )
+
+        return actions
+
+    def run(self, frames, actions=None):
+        """
+        Berechnet bis zu 'frames' Schritte. 'actions' kann für jeden Schritt
+        Aktionen enthalten, Form (frames, Spiele, 2), siehe 'step'.
+        """
+        for frame in range(frames):
+            if self.finished.all():
+                break
+            self.step(None if actions is None else actions[frame])
+
+        return self.score
+
+
+# Aktionen für 'PongEnv' und 'VectorPongEnv': 0 = stehen bleiben, 1 = hoch, 2 = runter
+ENV_ACTIONS = np.array([0, -1, 1], dtype=np.int32)
+
+
+def observation_size(ball_count):
+    """Länge einer Beobachtung: 2 Schläger und je 5 Werte pro Ball."""
+    return 2 + 5 * ball_count
+
+
+def _env_frames_per_step(frames_per_step):
+    """
+    'MatchBatch' rechnet nur mit ganzen Frames. Damit 'PongEnv' und
+    'VectorPongEnv' dasselbe Spiel bleiben, gilt das für beide Umgebungen.
+    """
+    if frames_per_step < 1 or frames_per_step != int(frames_per_step):
+        raise ValueError(
+            f"frames_per_step muss eine ganze Zahl ab 1 sein, nicht {frames_per_step!r}"
+        )
+    return int(frames_per_step)
+
+
+def _write_observation(
+    observation, paddle_y, ball_position, ball_speed, ball_active, window_size
+):
+    """
+    Schreibt den Zustand in ein vorhandenes numpy array (Google: numpy out
+    parameter), für ein einzelnes Spiel (Form (n,)) oder viele (Form (Spiele, n)):
+
+        [Schläger links (y), Schläger rechts (y),
+         Ball 0 (x, y, speed_x, speed_y, aktiv), Ball 1 (...), ...]
+
+    Positionen sind Anteile der Fenstergröße (0 bis 1), Geschwindigkeiten
+    werden durch 16 geteilt.
+    """
+    width, height = window_size
+    paddles = observation[..., :2]
+    balls = observation[..., 2:].reshape(observation.shape[:-1] + (-1, 5))
+
+    paddles[...] = paddle_y
+    paddles += MatchBatch.paddle_size[1] / 2
+    paddles *= 1 / height
+
+    balls[..., 0:2] = ball_position
+    balls[..., 0] *= 1 / width
+    balls[..., 1] *= 1 / height
+    balls[..., 2:4] = ball_speed
+    balls[..., 2:4] *= 1 / 16
+    balls[..., 4] = ball_active
+
+
+class PongEnv:
+    """
+    Eine Umgebung für Reinforcement Learning mit 'reset' und 'step' wie in
+    Gym/Gymnasium (Google: gymnasium Env), ohne davon abzuhängen.
+
+    Der Agent steuert den linken Schläger, rechts spielt ein 'TrajectoryBot'
+    (oder niemand mit 'opponent=None'). Belohnung: +1 für einen eigenen
+    Punkt, -1 für einen Punkt des Gegners.
+
+    Die Bälle werden immer mit 'BallArrays' berechnet, auch bei nur einem
+    Ball. Das ist dieselbe Physik wie in 'MatchBatch', ein Agent aus
+    'VectorPongEnv' spielt hier also dasselbe Spiel.
+
+    'step' gibt immer dasselbe numpy array als Beobachtung zurück. Wer ältere
+    Beobachtungen aufheben will, muss sie selbst kopieren.
+    """
+
+    action_count = len(ENV_ACTIONS)
+
+    def __init__(
+        self,
+        ball_count=1,
+        window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+        points_to_win=5,
+        max_steps=60 * 60 * 5,
+        frames_per_step=1,
+        opponent="bot",
+        seed=None,
+    ):
+        self.ball_count = ball_count
+        self.window_size = window_size
+        self.points_to_win = points_to_win
+        self.max_steps = max_steps
+        self.frames_per_step = _env_frames_per_step(frames_per_step)
+        self.opponent = opponent
+        self.seed = seed
+
+        self.app = Application(*window_size, headless=True)
+        self.matchfield = None
+        self.steps = 0
+        self.episodes = 0
+        self.observation = np.zeros(observation_size(ball_count), dtype=np.float32)
+
+        self._agent_bits = 0
+        self._agent = ScriptedInput(lambda matchfield: self._agent_bits)
+
+    def reset(self, seed=None, options=None):
+        """Startet ein neues Spiel. Gibt (Beobachtung, info) zurück."""
+        if seed is None and self.seed is not None:
+            # Mit 'seed' im Konstruktor: jedes Spiel anders, aber reproduzierbar
+            seed = (self.seed, self.episodes)
+        self.episodes += 1
+
+        self.matchfield = Matchfield(
+            self.app.main_window,
+            self.ball_count,
+            headless=True,
+            vectorized=True,
+            seed=seed,
+        )
+        opponent = TrajectoryBot(PlayerSide.RIGHT) if self.opponent == "bot" else None
+        self.matchfield.input_source = SplitInput(left=self._agent, right=opponent)
+        self.steps = 0
+
+        self._observe()
+        return self.observation, {}
+
+    def _observe(self):
+        matchfield = self.matchfield
+        position, speed, active = matchfield.ball_state()
+        paddle_y = (matchfield.player_left.rect.y, matchfield.player_right.rect.y)
+        _write_observation(
+            self.observation, paddle_y, position, speed, active, self.window_size
+        )
+
+    def step(self, action):
+        """Gibt (Beobachtung, Belohnung, beendet, abgebrochen, info) zurück."""
+        move = ENV_ACTIONS[action]
+        self._agent_bits = (
+            INPUT_LEFT_UP if move < 0 else INPUT_LEFT_DOWN if move > 0 else 0
+        )
+
+        left, right = self.matchfield.player_left, self.matchfield.player_right
+        score_before = (left.score, right.score)
+        self.matchfield.step(self.frames_per_step)
+        self.steps += 1
+
+        reward = float((left.score - score_before[0]) - (right.score - score_before[1]))
+        terminated = max(left.score, right.score) >= self.points_to_win
+        truncated = not terminated and self.steps >= self.max_steps
+
+        self._observe()
+        info = {"score": (left.score, right.score)}
+        return self.observation, reward, terminated, truncated, info
+
+
+class VectorPongEnv:
+    """
+    'env_count' Umgebungen wie 'PongEnv', die mit einem einzigen Aufruf
+    gemeinsam einen Schritt machen (Google: gymnasium vector env).
+
+    Die Spiele laufen in einer 'MatchBatch', also ohne Python-Schleife über
+    die Umgebungen, mit derselben Physik wie 'PongEnv'. Beobachtungen,
+    Belohnungen, die Flags und 'infos' werden bei jedem Schritt in dieselben,
+    vorab angelegten numpy arrays geschrieben.
+
+    Ist ein Spiel zu Ende, startet es sofort neu. Die zurückgegebene
+    Beobachtung ist dann schon die erste des neuen Spiels, der Endstand des
+    alten Spiels steht in 'infos["final_score"]' (gültig, wo
+    'infos["_final_score"]' True ist).
+    """
+
+    action_count = len(ENV_ACTIONS)
+
+    def __init__(
+        self,
+        env_count,
+        ball_count=1,
+        window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+        points_to_win=5,
+        max_steps=60 * 60 * 5,
+        frames_per_step=1,
+        opponent="bot",
+        seed=None,
+    ):
+        self.env_count = env_count
+        self.window_size = window_size
+        self.points_to_win = points_to_win
+        self.max_steps = max_steps
+        self.frames_per_step = _env_frames_per_step(frames_per_step)
+        self.opponent = opponent
+
+        # Das Spielende prüft die Umgebung selbst, die 'MatchBatch' läuft weiter
+        self.batch = MatchBatch(env_count, ball_count, window_size, seed=seed)
+        if opponent == "bot":
+            self.batch.bot_columns = (1,)
+
+        self.observations = np.zeros(
+            (env_count, observation_size(ball_count)), dtype=np.float32
+        )
+        self.rewards = np.zeros(env_count, dtype=np.float32)
+        self.terminated = np.zeros(env_count, dtype=bool)
+        self.truncated = np.zeros(env_count, dtype=bool)
+        self.steps = np.zeros(env_count, dtype=np.int64)
+
+        self._actions = np.zeros((env_count, 2), dtype=np.int32)
+        self._score_before = np.zeros((env_count, 2), dtype=np.int32)
+        self._done = np.zeros(env_count, dtype=bool)
+        self.infos = {
+            "score": self.batch.score,
+            "final_score": np.zeros((env_count, 2), dtype=np.int32),
+            "_final_score": self._done,
+        }
+
+    def _observe(self):
+        batch = self.batch
+        _write_observation(
+            self.observations,
+            batch.paddle_y,
+            batch.ball_position,
+            batch.ball_speed,
+            batch.ball_active,
+            self.window_size,
+        )
+
+    def reset(self, seed=None, options=None):
+        """Startet alle Spiele neu. Gibt (Beobachtungen, infos) zurück."""
+        if seed is not None:
+            self.batch.random = MatchRandom(seed)
+
+        everything = np.ones(self.env_count, dtype=bool)
+        self.batch.score[:] = 0
+        self.batch.reset(everything)
+        self.steps[:] = 0
+        self._done[:] = False
+
+        self._observe()
+        return self.observations, self.infos
+
+    def step(self, actions):
+        """
+        'actions' enthält eine Aktion pro Umgebung. Gibt (Beobachtungen,
+        Belohnungen, beendet, abgebrochen, infos) zurück.
+        """
+        batch = self.batch
+        np.take(ENV_ACTIONS, actions, out=self._actions[:, 0])
+
+        self._score_before[:] = batch.score
+        batch.step(self._actions, self.frames_per_step)
+        self.steps += 1
+
+        # Belohnung: eigene Punkte minus Punkte des Gegners
+        gained = batch.score - self._score_before
+        np.subtract(gained[:, 0], gained[:, 1], out=self.rewards, casting="unsafe")
+
+        np.greater_equal(
+            batch.score.max(axis=1), self.points_to_win, out=self.terminated
+        )
+        np.greater_equal(self.steps, self.max_steps, out=self.truncated)
+        self.truncated &= ~self.terminated
+
+        np.logical_or(self.terminated, self.truncated, out=self._done)
+        if self._done.any():
+            self.infos["final_score"][self._done] = batch.score[self._done]
+            batch.score[self._done] = 0
+            batch.reset(self._done)
+            self.steps[self._done] = 0
+
+        self._observe()
+        return (
+            self.observations,
+            self.rewards,
+            self.terminated,
+            self.truncated,
+            self.infos,
+        )
+
+
+def replay_frame_dtype(ball_count):
+    """
+    Aufbau eines einzelnen Frames in einer Replay-Datei.
+
+    Alle Frames sind gleich groß. Frame Nummer 'i' beginnt deshalb immer bei
+    Byte 'REPLAY_HEADER_SIZE + i * dtype.itemsize' (Google: numpy structured array).
+    """
+    return np.dtype(
+        [
+            ("tick", "<u4"),
+            ("input", "u1"),
+            ("score", "<u2", (2,)),
+            ("paddle_y", "<i2", (2,)),
+            ("ball_position", "<i2", (ball_count, 2)),
+            ("ball_speed", "<i2", (ball_count, 2)),
+            ("ball_active", "u1", (ball_count,)),
+        ]
+    )
+
+
+# Kopf einer Replay-Datei (Google: binary file header, magic number)
+#   8 Bytes Kennung, Version, Anzahl Bälle, Fenstergröße, Anzahl Frames,
+#   Größe eines Frames in Bytes und der Startwert: bis zu drei Zahlen, damit
+#   auch Startwerte wie '(seed, match_index)' aus 'simulate_matches' passen
+REPLAY_MAGIC = b"PONGRPL1"
+REPLAY_VERSION = 2
+REPLAY_SEED_PARTS = 3
+REPLAY_HEADER = struct.Struct(f"<8sHIHHQIB{REPLAY_SEED_PARTS}Q")
+REPLAY_HEADER_SIZE = 64
+
+
+def _replay_seed_parts(seed):
+    """
+    Der Startwert als Tupel aus Zahlen für den Kopf einer Replay-Datei. Ohne
+    Startwert, oder wenn er nicht in den Kopf passt, ist das Tupel leer.
+    """
+    if seed is None:
+        return ()
+
+    parts = (seed,) if np.ndim(seed) == 0 else tuple(seed)
+    if len(parts) > REPLAY_SEED_PARTS or not all(
+        isinstance(part, (int, np.integer)) and 0 <= part < 2**64 for part in parts
+    ):
+        return ()
+    return tuple(int(part) for part in parts)
+
+
+class ReplayWriter:
+    """
+    Schreibt jeden Physik-Schritt eines 'Matchfield' in eine Binärdatei.
+
+    Die Frames werden in einem numpy array gesammelt und blockweise mit
+    'tofile' geschrieben. Es gibt kein JSON und kein pickle, eine Datei
+    kann später direkt mit 'ReplayReader' in den Speicher eingeblendet werden.
+    """
+
+    def __init__(self, path, matchfield, buffer_frames=4096):
+        self.path = path
+        self.ball_count = matchfield.max_active_balls_on_field
+        self.dtype = replay_frame_dtype(self.ball_count)
+        self.frame_count = 0
+
+        self._seed_parts = _replay_seed_parts(matchfield.random.seed)
+        self._size = matchfield.main_window.get_size()
+
+        # Pro Feld ein eigenes, einfaches numpy array. Einzelne Zeilen darin
+        # zu beschreiben ist viel schneller als in einem 'structured array'.
+        self._buffer = np.zeros(buffer_frames, dtype=self.dtype)
+        self._columns = {
+            name: np.zeros(
+                (buffer_frames,) + self.dtype[name].shape, self.dtype[name].base
+            )
+            for name in self.dtype.names
+        }
+        self._buffered = 0
+
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = REPLAY_HEADER.pack(
+            REPLAY_MAGIC,
+            REPLAY_VERSION,
+            self.ball_count,
+            *self._size,
+            self.frame_count,
+            self.dtype.itemsize,
+            len(self._seed_parts),
+            *self._seed_parts,
+            *[0] * (REPLAY_SEED_PARTS - len(self._seed_parts)),
+        )
+        self._file.seek(0)
+        self._file.write(header.ljust(REPLAY_HEADER_SIZE, b"\0"))
+
+    def record(self, matchfield):
+        index = self._buffered
+        columns = self._columns
+        position, speed, active = matchfield.ball_state()
+
+        columns["tick"][index] = matchfield.ticks
+        columns["input"][index] = matchfield.last_input
+        columns["score"][index] = (
+            matchfield.player_left.score,
+            matchfield.player_right.score,
+        )
+        columns["paddle_y"][index] = (
+            matchfield.player_left.rect.y,
+            matchfield.player_right.rect.y,
+        )
+        columns["ball_position"][index] = position
+        columns["ball_speed"][index] = speed
+        columns["ball_active"][index] = active
+
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        count = self._buffered
+        for name, column in self._columns.items():
+            self._buffer[name][:count] = column[:count]
+
+        self._file.seek(0, os.SEEK_END)
+        self._buffer[:count].tofile(self._file)
+        self.frame_count += self._buffered
+        self._buffered = 0
+
+        # Der Kopf wird jedes Mal erneuert. Bricht das Programm ab, enthält
+        # die Datei dann trotzdem alle bis hierhin geschriebenen Frames.
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayReader:
+    """
+    Liest eine Replay-Datei über 'numpy.memmap' (Google: memory-mapped file).
+
+    Die Datei wird nicht eingelesen oder umgewandelt, sondern nur in den
+    Speicher eingeblendet. Der Sprung zu einem beliebigen Frame oder das
+    Durchsuchen eines ganzen Spiels kostet deshalb keine Zeit für das Parsen.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as replay_file:
+            header = replay_file.read(REPLAY_HEADER.size)
+            file_size = os.fstat(replay_file.fileno()).st_size
+
+        (
+            magic,
+            version,
+            self.ball_count,
+            width,
+            height,
+            self.frame_count,
+            frame_size,
+            seed_length,
+            *seed_parts,
+        ) = REPLAY_HEADER.unpack(header)
+
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(
+                f"{path} ist keine Replay-Datei (Version {REPLAY_VERSION})"
+            )
+
+        self.window_size = (width, height)
+
+        # Derselbe Startwert wie beim Aufnehmen, z.B. für 'Matchfield(seed=...)'
+        seed_parts = tuple(seed_parts[:seed_length])
+        if not seed_parts:
+            self.seed = None
+        elif len(seed_parts) == 1:
+            self.seed = seed_parts[0]
+        else:
+            self.seed = seed_parts
+
+        self.dtype = replay_frame_dtype(self.ball_count)
+        if frame_size != self.dtype.itemsize:
+            raise ValueError(f"{path}: unerwartete Framegröße {frame_size}")
+
+        # Wurde die Datei nicht geschlossen (z.B. Absturz), ist die Zahl im
+        # Kopf veraltet. Es zählen deshalb alle vollständigen Frames der Datei.
+        self.frame_count = max(0, file_size - REPLAY_HEADER_SIZE) // frame_size
+
+        # Alle Frames als ein einziges (schreibgeschütztes) numpy array
+        self.frames = np.memmap(
+            path,
+            dtype=self.dtype,
+            mode="r",
+            offset=REPLAY_HEADER_SIZE,
+            shape=(self.frame_count,),
+        )
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def restore(self, matchfield, index):
+        """Setzt ein 'Matchfield' auf den Zustand von Frame 'index'."""
+        restore_frame(matchfield, self.frames[index])
+
+
+def capture_frame(matchfield, dtype=None):
+    """
+    Der Zustand eines 'Matchfield' als einzelner Frame ('replay_frame_dtype').
+    Für viele Frames hintereinander ist 'ReplayWriter' schneller.
+    """
+    frame = np.zeros(
+        (), dtype=dtype or replay_frame_dtype(matchfield.max_active_balls_on_field)
+    )
+    position, speed, active = matchfield.ball_state()
+
+    frame["tick"] = matchfield.ticks
+    frame["input"] = matchfield.last_input
+    frame["score"] = (matchfield.player_left.score, matchfield.player_right.score)
+    frame["paddle_y"] = (matchfield.player_left.rect.y, matchfield.player_right.rect.y)
+    if len(active):
+        frame["ball_position"] = position
+        frame["ball_speed"] = speed
+        frame["ball_active"] = active
+    return frame
+
+
+def restore_frame(matchfield, frame):
+    """Setzt ein 'Matchfield' auf den Zustand eines Frames ('replay_frame_dtype')."""
+    matchfield.ticks = int(frame["tick"])
+    matchfield.last_input = int(frame["input"])
+    matchfield.player_left.score, matchfield.player_right.score = (
+        int(score) for score in frame["score"]
+    )
+    matchfield.player_left.rect.y, matchfield.player_right.rect.y = (
+        int(y) for y in frame["paddle_y"]
+    )
+    matchfield.set_ball_state(
+        frame["ball_position"], frame["ball_speed"], frame["ball_active"]
+    )
+
+
+class SnapshotCodec:
+    """
+    Verpackt den Zustand eines 'Matchfield' für das Netzwerk.
+
+    Ein Zustand ist ein Frame wie in einer Replay-Datei ('replay_frame_dtype').
+    Ein Schlüsselbild (engl. keyframe) enthält den ganzen Frame. Ein Delta
+    enthält nur die 16-Bit-Wörter, die sich gegenüber einem älteren Frame
+    (der Basis) geändert haben, und eine Bitmaske, welche das sind
+    (Google: delta compression). Pro Schritt ändern sich meist nur die
+    Positionen der Bälle, ein Delta ist deshalb deutlich kleiner.
+    """
+
+    KEYFRAME = 0
+    DELTA = 1
+
+    def __init__(self, ball_count):
+        self.ball_count = ball_count
+        self.dtype = replay_frame_dtype(ball_count)
+        self.frame_size = self.dtype.itemsize
+        self.word_count = (self.frame_size + 1) // 2
+        self.mask_size = (self.word_count + 7) // 8
+
+    def frame_bytes(self, matchfield):
+        return capture_frame(matchfield, self.dtype).tobytes()
+
+    def _words(self, frame_bytes):
+        # Bei ungerader Framegröße mit einem Null-Byte auffüllen
+        padded = frame_bytes.ljust(self.word_count * 2, b"\0")
+        return np.frombuffer(padded, dtype="<u2")
+
+    def encode_delta(self, frame_bytes, base_bytes):
+        words = self._words(frame_bytes)
+        changed = words != self._words(base_bytes)
+        mask = np.packbits(changed, bitorder="little")
+        return mask.tobytes() + words[changed].tobytes()
+
+    def decode_delta(self, payload, base_bytes):
+        mask = np.frombuffer(payload[: self.mask_size], dtype=np.uint8)
+        changed = np.unpackbits(mask, count=self.word_count, bitorder="little").astype(
+            bool
+        )
+
+        words = self._words(base_bytes).copy()
+        words[changed] = np.frombuffer(payload[self.mask_size :], dtype="<u2")
+        return words.tobytes()[: self.frame_size]
+
+    def decode(self, kind, payload, base_bytes=None):
+        """Gibt die Bytes des Frames zurück, bei einem Delta mit 'base_bytes'."""
+        if kind == self.KEYFRAME:
+            if len(payload) != self.frame_size:
+                raise ValueError("Schlüsselbild hat die falsche Größe")
+            return payload
+        return self.decode_delta(payload, base_bytes)
+
+    def frame(self, frame_bytes):
+        return np.frombuffer(frame_bytes, dtype=self.dtype)[0]
+
+
+# Pakete zwischen Host und Client (Google: UDP game networking)
+#   Eingabe:  Kennung, Eingabe-Bits, laufende Nummer, letzter empfangener Tick
+#   Zustand:  Kennung, Art (Schlüsselbild/Delta), Tick, Tick der Basis,
+#             Nummer der zuletzt verarbeiteten Eingabe, danach die Daten
+INPUT_PACKET = struct.Struct("<4sBII")
+SNAPSHOT_PACKET = struct.Struct("<4sBIII")
+INPUT_MAGIC = b"PNGI"
+SNAPSHOT_MAGIC = b"PNGS"
+
+# Eingabe an einen 'MatchServer': zusätzlich Nummer des Spiels und Seite
+# (0 = links, 1 = rechts)
+MATCH_INPUT_PACKET = struct.Struct("<4sIBBII")
+MATCH_INPUT_MAGIC = b"PNGM"
+MAX_PACKET_SIZE = 65507
+
+
+class RemoteInput:
+    """
+    Eingaben, die über das Netzwerk ankommen.
+
+    Die Eingaben werden in einer kurzen Warteschlange gepuffert und pro
+    Physik-Schritt genau eine davon verbraucht (Google: jitter buffer). Ist
+    die Warteschlange leer, gilt die letzte Eingabe weiter.
+    """
+
+    def __init__(self, max_queued=4):
+        self.queue = deque(maxlen=max_queued)
+        self.last_bits = 0
+        self.last_sequence = 0
+
+    def push(self, sequence, input_bits):
+        # Verspätete oder doppelte Pakete ignorieren
+        newest = self.queue[-1][0] if self.queue else self.last_sequence
+        if sequence > newest:
+            self.queue.append((sequence, input_bits))
+
+    def read(self, matchfield):
+        if self.queue:
+            self.last_sequence, self.last_bits = self.queue.popleft()
+        return self.last_bits
+
+
+def _open_udp_socket(address):
+    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp_socket.bind(address)
+    udp_socket.setblocking(False)
+    return udp_socket
+
+
+def _receive_all(udp_socket):
+    """Alle Pakete, die gerade im Puffer des Sockets liegen, ohne zu warten."""
+    while True:
+        try:
+            yield udp_socket.recvfrom(MAX_PACKET_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionResetError:
+            # Windows meldet so, dass die Gegenseite (noch) nicht erreichbar ist
+            continue
+
+
+class FrameHistory:
+    """
+    Die letzten 'size' Frames (als Bytes) nach Tick, als mögliche Basis für
+    ein Delta. Ältere Frames werden vergessen (Google: ring buffer).
+    """
+
+    def __init__(self, size=64):
+        self.size = size
+        self._frames = {}
+
+    def __contains__(self, tick):
+        return tick in self._frames
+
+    def get(self, tick):
+        return self._frames.get(tick)
+
+    def add(self, tick, frame_bytes):
+        # Ein Dictionary behält die Reihenfolge, der älteste Frame steht vorne
+        self._frames.pop(tick, None)
+        self._frames[tick] = frame_bytes
+        if len(self._frames) > self.size:
+            del self._frames[next(iter(self._frames))]
+
+
+class NetworkHost:
+    """
+    Berechnet ein Spiel für zwei Rechner (Google: authoritative server).
+
+    Nur der Host rechnet die Physik. Der linke Schläger wird weiter über die
+    bisherige Eingabequelle gesteuert, der rechte von einem 'NetworkClient'.
+    Nach jedem Schritt bekommt der Client den neuen Zustand, als Delta zu
+    dem letzten Zustand, dessen Empfang er bestätigt hat.
+    """
+
+    def __init__(self, matchfield, address=("127.0.0.1", 0), keyframe_interval=60):
+        self.matchfield = matchfield
+        self.codec = SnapshotCodec(matchfield.max_active_balls_on_field)
+        self.keyframe_interval = keyframe_interval
+
+        self.remote_input = RemoteInput()
+        matchfield.input_source = SplitInput(
+            left=matchfield.input_source, right=self.remote_input
+        )
+
+        self.socket = _open_udp_socket(address)
+        self.client_address = None
+        self.acknowledged_tick = None
+
+        # Zuletzt gesendete Frames als mögliche Basis für ein Delta
+        self._sent = FrameHistory()
+
+    @property
+    def address(self):
+        return self.socket.getsockname()
+
+    def poll(self):
+        for packet, sender in _receive_all(self.socket):
+            if len(packet) != INPUT_PACKET.size:
+                continue
+            magic, input_bits, sequence, acknowledged = INPUT_PACKET.unpack(packet)
+            if magic != INPUT_MAGIC:
+                continue
+
+            self.client_address = sender
+            self.remote_input.push(sequence, input_bits & INPUT_RIGHT)
+            if self.acknowledged_tick is None or acknowledged > self.acknowledged_tick:
+                self.acknowledged_tick = acknowledged
+
+    def send_snapshot(self):
+        if self.client_address is None:
+            return 0
+
+        tick = self.matchfield.ticks
+        frame_bytes = self.codec.frame_bytes(self.matchfield)
+
+        base_tick = self.acknowledged_tick
+        if base_tick not in self._sent or tick % self.keyframe_interval == 0:
+            kind, base_tick, payload = SnapshotCodec.KEYFRAME, tick, frame_bytes
+        else:
+            kind = SnapshotCodec.DELTA
+            payload = self.codec.encode_delta(frame_bytes, self._sent.get(base_tick))
+
+        self._sent.add(tick, frame_bytes)
+
+        header = SNAPSHOT_PACKET.pack(
+            SNAPSHOT_MAGIC, kind, tick, base_tick, self.remote_input.last_sequence
+        )
+        return self.socket.sendto(header + payload, self.client_address)
+
+    def tick(self, frames=1):
+        """
+        Ein Schritt: Eingaben empfangen, Physik berechnen, Zustand senden.
+        Solange sich noch kein Client gemeldet hat, wartet das Spiel.
+        """
+        self.poll()
+        if self.client_address is None:
+            return False
+
+        self.matchfield.step(frames)
+        self.send_snapshot()
+        return True
+
+    def close(self):
+        self.socket.close()
+
+
+class NetworkClient:
+    """
+    Spielt auf einem zweiten Rechner gegen einen 'NetworkHost' mit.
+
+    Der Client rechnet keine Physik. Er schickt seine Eingaben und zeigt den
+    Zustand, den der Host zurückschickt. Damit sich der eigene Schläger
+    trotz Verzögerung im Netzwerk sofort bewegt, wird er vorab lokal bewegt
+    (Google: client-side prediction). Kommt ein neuer Zustand vom Host, wird
+    der Schläger auf dessen Position gesetzt und alle Eingaben, die der Host
+    noch nicht verarbeitet hat, werden erneut angewendet (Google: server
+    reconciliation).
+    """
+
+    def __init__(
+        self,
+        matchfield,
+        host_address,
+        address=("127.0.0.1", 0),
+        side=PlayerSide.RIGHT,
+        match_id=None,
+    ):
+        self.matchfield = matchfield
+        self.host_address = host_address
+        self.codec = SnapshotCodec(matchfield.max_active_balls_on_field)
+
+        # Gegen einen 'NetworkHost' ist der Client immer rechts. Bei einem
+        # 'MatchServer' wählt er das Spiel ('match_id') und die Seite.
+        self.side = side
+        self.match_id = match_id
+        if side == PlayerSide.LEFT:
+            self.input_mask, self.paddle = INPUT_LEFT, matchfield.player_left
+        else:
+            self.input_mask, self.paddle = INPUT_RIGHT, matchfield.player_right
+
+        # Der Client steuert nur den Schläger, den er auch vorhersagt. Ohne
+        # Eingabequelle ('headless') steht der Schläger still.
+        self.local_input = matchfield.input_source
+        matchfield.input_source = None
+
+        self.socket = _open_udp_socket(address)
+        self.sequence = 0
+        self.pending_inputs = deque()
+
+        self.latest_tick = None
+        self._received = FrameHistory()
+
+    def send_input(self, frames=1):
+        input_bits = 0
+        if self.local_input is not None:
+            input_bits = self.local_input.read(self.matchfield) & self.input_mask
+        self.sequence += 1
+
+        if self.match_id is None:
+            packet = INPUT_PACKET.pack(
+                INPUT_MAGIC, input_bits, self.sequence, self.latest_tick or 0
+            )
+        else:
+            packet = MATCH_INPUT_PACKET.pack(
+                MATCH_INPUT_MAGIC,
+                self.match_id,
+                self.side == PlayerSide.RIGHT,
+                input_bits,
+                self.sequence,
+                self.latest_tick or 0,
+            )
+        self.socket.sendto(packet, self.host_address)
+
+        # Vorhersage: den eigenen Schläger sofort bewegen
+        self.pending_inputs.append((self.sequence, input_bits))
+        self.matchfield.apply_input(input_bits, frames)
+
+    def poll(self, frames=1):
+        """Verarbeitet alle angekommenen Zustände. Gibt True zurück, wenn es einen neuen gab."""
+        newest = None
+        for packet, _ in _receive_all(self.socket):
+            if len(packet) < SNAPSHOT_PACKET.size:
+                continue
+            magic, kind, tick, base_tick, processed = SNAPSHOT_PACKET.unpack_from(
+                packet
+            )
+            if magic != SNAPSHOT_MAGIC:
+                continue
+
+            base_bytes = self._received.get(base_tick)
+            if kind == SnapshotCodec.DELTA and base_bytes is None:
+                continue  # Basis fehlt, das nächste Schlüsselbild abwarten
+            try:
+                frame_bytes = self.codec.decode(
+                    kind, packet[SNAPSHOT_PACKET.size :], base_bytes
+                )
+            except ValueError:
+                continue
+
+            self._received.add(tick, frame_bytes)
+            if self.latest_tick is None or tick > self.latest_tick:
+                self.latest_tick = tick
+                newest = (frame_bytes, processed)
+
+        if newest is None:
+            return False
+
+        frame_bytes, processed = newest
+        restore_frame(self.matchfield, self.codec.frame(frame_bytes))
+        self._reconcile(processed, frames)
+        return True
+
+    def _reconcile(self, processed, frames):
+        while self.pending_inputs and self.pending_inputs[0][0] <= processed:
+            self.pending_inputs.popleft()
+
+        self.paddle._subpixel_y = 0.0
+        for _, input_bits in self.pending_inputs:
+            self.matchfield.apply_input(input_bits, frames)
+
+    def tick(self, frames=1):
+        """Ein Schritt: Eingabe senden und vorhersagen, Zustand empfangen."""
+        self.send_input(frames)
+        self.poll(frames)
+
+    def close(self):
+        self.socket.close()
+
+
+class ServerMatch:
+    """Ein Spiel auf einem 'MatchServer' mit den Adressen seiner Spieler."""
+
+    def __init__(self, match_id, matchfield):
+        self.match_id = match_id
+        self.matchfield = matchfield
+        self.codec = SnapshotCodec(matchfield.max_active_balls_on_field)
+
+        self.inputs = (RemoteInput(), RemoteInput())
+        matchfield.input_source = SplitInput(left=self.inputs[0], right=self.inputs[1])
+
+        # Adresse -> [Seite, zuletzt bestätigter Tick]
+        self.players = {}
+        self.last_seen = 0.0
+
+        self._sent = FrameHistory()
+
+    def receive(self, address, side, sequence, input_bits, acknowledged, now):
+        self.inputs[side].push(sequence, input_bits)
+        player = self.players.setdefault(address, [side, None])
+        player[0] = side
+        if player[1] is None or acknowledged > player[1]:
+            player[1] = acknowledged
+        self.last_seen = now
+
+    def snapshots(self):
+        """
+        Pakete mit dem aktuellen Zustand für alle Spieler als (Adresse, Daten).
+        Der Frame wird nur einmal erzeugt, Deltas zur gleichen Basis nur einmal.
+        """
+        tick = self.matchfield.ticks
+        frame_bytes = self.codec.frame_bytes(self.matchfield)
+        payloads = {}
+
+        for address, (side, acknowledged) in self.players.items():
+            base_tick = acknowledged if acknowledged in self._sent else None
+            if base_tick not in payloads:
+                if base_tick is None:
+                    payloads[base_tick] = (SnapshotCodec.KEYFRAME, tick, frame_bytes)
+                else:
+                    delta = self.codec.encode_delta(
+                        frame_bytes, self._sent.get(base_tick)
+                    )
+                    payloads[base_tick] = (SnapshotCodec.DELTA, base_tick, delta)
+
+            kind, header_base, payload = payloads[base_tick]
+            header = SNAPSHOT_PACKET.pack(
+                SNAPSHOT_MAGIC, kind, tick, header_base, self.inputs[side].last_sequence
+            )
+            yield address, header + payload
+
+        self._sent.add(tick, frame_bytes)
+
+
+class MatchServer:
+    """
+    Viele Spiele im 'headless' Modus in einem einzigen Prozess
+    (Google: asyncio game server).
+
+    Spieler schicken ihre Eingaben per UDP mit der Nummer des Spiels und
+    ihrer Seite (siehe 'NetworkClient' mit 'match_id'). Ein Spiel wird beim
+    ersten Paket angelegt. Alle laufenden Spiele werden von einer einzigen
+    Schleife im Takt 'tick_rate' berechnet. Kommt von einem Spiel
+    'idle_timeout' Sekunden lang keine Eingabe, pausiert es und kostet keine
+    Rechenzeit mehr, bis wieder eine Eingabe ankommt. Nach 'evict_timeout'
+    Sekunden ohne Eingabe wird es ganz entfernt und gibt seinen Speicher frei.
+    Sind schon 'max_matches' Spiele angelegt, muss für ein neues Spiel das
+    am längsten pausierte Platz machen.
+
+    Pro Runde der Schleife rechnet jedes Spiel höchstens
+    'max_ticks_per_round' Schritte. Hängt der Server hinterher, laufen die
+    Spiele langsamer, statt dass ein Spiel die anderen ausbremst. Die
+    Reihenfolge der Spiele wechselt jede Runde, damit keines immer als
+    letztes drankommt.
+    """
+
+    def __init__(
+        self,
+        ball_count=3,
+        window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+        tick_rate=60,
+        max_ticks_per_round=4,
+        idle_timeout=5.0,
+        evict_timeout=60.0,
+        max_matches=1000,
+    ):
+        self.ball_count = ball_count
+        self.tick_seconds = 1.0 / tick_rate
+        self.max_ticks_per_round = max_ticks_per_round
+        self.idle_timeout = idle_timeout
+        self.evict_timeout = evict_timeout
+        self.max_matches = max_matches
+
+        # Alle Spiele teilen sich eine Surface, gezeichnet wird nichts
+        self.app = Application(*window_size, headless=True)
+        self.matches = {}
+        self.active = {}
+        self.socket = None
+        self.receive_buffer = 4 * 1024 * 1024
+        self.rounds = 0
+
+        # Höchstens einmal pro Sekunde nach alten Spielen suchen
+        self._next_eviction = 0.0
+        self._wake_up = asyncio.Event()
+        self._running = False
+
+    def _read_packets(self):
+        # asyncio liest bei 'create_datagram_endpoint' nur ein Paket pro
+        # Durchlauf der Event-Loop. Bei hunderten Spielern wird deshalb
+        # hier jedes Mal alles abgeholt, was im Empfangspuffer liegt.
+        for packet, address in _receive_all(self.socket):
+            self.packet_received(packet, address)
+
+    def packet_received(self, packet, address):
+        if len(packet) != MATCH_INPUT_PACKET.size:
+            return
+        (
+            magic,
+            match_id,
+            side,
+            input_bits,
+            sequence,
+            acknowledged,
+        ) = MATCH_INPUT_PACKET.unpack(packet)
+        if magic != MATCH_INPUT_MAGIC or side > 1:
+            return
+
+        match = self.match(match_id)
+        if match is None:
+            return
+
+        mask = INPUT_RIGHT if side else INPUT_LEFT
+        now = time.monotonic()
+        match.receive(address, side, sequence, input_bits & mask, acknowledged, now)
+        self.active[match_id] = match
+        self._wake_up.set()
+
+    def match(self, match_id):
+        """Gibt das Spiel 'match_id' zurück und legt es bei Bedarf an."""
+        match = self.matches.get(match_id)
+        if match is None:
+            if len(self.matches) >= self.max_matches and not self._evict_paused_match():
+                return None
+            matchfield = Matchfield(
+                self.app.main_window, self.ball_count, headless=True
+            )
+            match = self.matches[match_id] = ServerMatch(match_id, matchfield)
+        return match
+
+    def remove_match(self, match_id):
+        self.matches.pop(match_id, None)
+        self.active.pop(match_id, None)
+
+    def _evict_paused_match(self):
+        # Nur ein pausiertes Spiel darf einem neuen Platz machen
+        paused = [
+            match
+            for match in self.matches.values()
+            if match.match_id not in self.active
+        ]
+        if not paused:
+            return False
+
+        oldest = min(paused, key=lambda match: match.last_seen)
+        self.remove_match(oldest.match_id)
+        return True
+
+    def evict_idle_matches(self, now=None):
+        """Entfernt alle Spiele, von denen 'evict_timeout' Sekunden nichts kam."""
+        now = time.monotonic() if now is None else now
+        for match_id, match in list(self.matches.items()):
+            if now - match.last_seen > self.evict_timeout:
+                self.remove_match(match_id)
+
+    def run_round(self, ticks, now=None):
+        """Berechnet für jedes laufende Spiel bis zu 'ticks' Schritte."""
+        now = time.monotonic() if now is None else now
+        ticks = min(ticks, self.max_ticks_per_round)
+
+        matches = list(self.active.values())
+        if matches:
+            start = self.rounds % len(matches)
+            matches = matches[start:] + matches[:start]
+        self.rounds += 1
+
+        for match in matches:
+            if now - match.last_seen > self.idle_timeout:
+                del self.active[match.match_id]
+                continue
+
+            for _ in range(ticks):
+                match.matchfield.step()
+
+            if self.socket is not None:
+                unreachable = []
+                for address, packet in match.snapshots():
+                    try:
+                        self.socket.sendto(packet, address)
+                    except BlockingIOError:
+                        pass  # UDP: ein verlorenes Paket ersetzt der nächste Schritt
+                    except OSError:
+                        unreachable.append(address)
+
+                # Schickt der Spieler wieder eine Eingabe, wird er neu angemeldet
+                for address in unreachable:
+                    del match.players[address]
+
+    async def start(self, address=("127.0.0.1", 0)):
+        self.socket = _open_udp_socket(address)
+
+        # Während einer Runde kommen Pakete von sehr vielen Spielern an. Mit
+        # einem größeren Empfangspuffer gehen dabei keine verloren.
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+
+        asyncio.get_running_loop().add_reader(self.socket, self._read_packets)
+        return self.socket.getsockname()
+
+    async def run(self):
+        """Die gemeinsame Schleife für alle Spiele (Google: fixed timestep)."""
+        self._running = True
+        next_tick = time.monotonic()
+
+        while self._running:
+            if not self.active:
+                # Nichts zu tun: schlafen, bis wieder eine Eingabe ankommt.
+                # Zwischendurch werden alte Spiele aufgeräumt.
+                self._wake_up.clear()
+                try:
+                    await asyncio.wait_for(self._wake_up.wait(), self.evict_timeout)
+                except asyncio.TimeoutError:
+                    self.evict_idle_matches()
+                    continue
+                next_tick = time.monotonic()
+
+            now = time.monotonic()
+            if now >= self._next_eviction:
+                self.evict_idle_matches(now)
+                self._next_eviction = now + 1.0
+
+            ticks = 0
+            while next_tick <= now:
+                next_tick += self.tick_seconds
+                ticks += 1
+
+            if ticks:
+                self.run_round(ticks, now)
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+    def stop(self):
+        self._running = False
+        self._wake_up.set()
+        if self.socket is not None:
+            asyncio.get_running_loop().remove_reader(self.socket)
+            self.socket.close()
+            self.socket = None
+
+
+async def serve_matches(address, **settings):
+    server = MatchServer(**settings)
+    host, port = await server.start(address)
+    print(f"Server für viele Spiele an {host}:{port}")
+    try:
+        await server.run()
+    finally:
+        server.stop()
+
+
+def play_network(role, address, ball_count=3, seed=None, fps=60):
+    """
+    Spielt ein Spiel über das Netzwerk, entweder als Host ('host', linker
+    Schläger) oder als Client ('join', rechter Schläger).
+    """
+    pygame.init()
+
+    app = Application(WINDOW_WIDTH, WINDOW_HEIGHT)
+    matchfield = Matchfield(app.main_window, ball_count, seed=seed)
+    if role == "host":
+        peer = NetworkHost(matchfield, address)
+        print(f"Warte auf Mitspieler an {peer.address[0]}:{peer.address[1]}")
+    else:
+        peer = NetworkClient(matchfield, address)
+
+    app.isRunning = True
+    while app.isRunning:
+        app.clock.tick(fps)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                app.isRunning = False
+
+        peer.tick()
+        matchfield.render()
+
+    peer.close()
+
+
+# Zuschauer melden sich mit diesem Paket an und wiederholen es regelmäßig,
+# solange sie zusehen wollen
+WATCH_PACKET = b"PNGW"
+
+
+class SpectatorFeed:
+    """
+    Überträgt ein laufendes Spiel an beliebig viele Zuschauer (z.B. die
+    Bildschirme in der Halle).
+
+    Pro Schritt wird der Zustand genau einmal verpackt, unabhängig von der
+    Anzahl der Zuschauer: alle 'keyframe_interval' Schritte ein
+    Schlüsselbild, sonst ein Delta zum letzten Schlüsselbild (wie I- und
+    P-Frames bei Videos). Geht ein Paket verloren, ist deshalb trotzdem das
+    nächste wieder lesbar.
+
+    Das Verschicken an die Zuschauer übernimmt ein eigener Thread. Die
+    Game-Loop legt nur das fertige Paket in eine Warteschlange und braucht
+    so gleich viel Zeit, egal wie viele Zuschauer zusehen.
+    """
+
+    def __init__(
+        self,
+        matchfield,
+        address=("127.0.0.1", 0),
+        keyframe_interval=60,
+        viewer_timeout=5.0,
+    ):
+        self.codec = SnapshotCodec(matchfield.max_active_balls_on_field)
+        self.keyframe_interval = keyframe_interval
+        self.viewer_timeout = viewer_timeout
+
+        self.socket = _open_udp_socket(address)
+        # Zuschauer-Adresse -> Zeitpunkt der letzten Anmeldung
+        self.viewers = {}
+
+        self._keyframe = None
+        self._keyframe_packet = None
+        self._ticks_since_keyframe = 0
+
+        self._packets = deque(maxlen=8)
+        self._new_packet = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self):
+        return self.socket.getsockname()
+
+    def publish(self, matchfield):
+        """Verpackt den aktuellen Zustand und übergibt ihn dem Sende-Thread."""
+        tick = matchfield.ticks
+        frame_bytes = self.codec.frame_bytes(matchfield)
+
+        if (
+            self._keyframe is None
+            or self._ticks_since_keyframe >= self.keyframe_interval
+        ):
+            self._keyframe = (tick, frame_bytes)
+            self._ticks_since_keyframe = 0
+            header = SNAPSHOT_PACKET.pack(
+                SNAPSHOT_MAGIC, SnapshotCodec.KEYFRAME, tick, tick, 0
+            )
+            packet = header + frame_bytes
+            self._keyframe_packet = packet
+        else:
+            base_tick, base_bytes = self._keyframe
+            header = SNAPSHOT_PACKET.pack(
+                SNAPSHOT_MAGIC, SnapshotCodec.DELTA, tick, base_tick, 0
+            )
+            packet = header + self.codec.encode_delta(frame_bytes, base_bytes)
+        self._ticks_since_keyframe += 1
+
+        with self._new_packet:
+            self._packets.append(packet)
+            self._new_packet.notify()
+
+    def _accept_viewers(self):
+        now = time.monotonic()
+        for packet, address in _receive_all(self.socket):
+            if packet != WATCH_PACKET:
+                continue
+            if address not in self.viewers and self._keyframe_packet is not None:
+                # Neue Zuschauer bekommen sofort das letzte Schlüsselbild
+                self._send(self._keyframe_packet, address)
+            self.viewers[address] = now
+
+        for address, last_seen in list(self.viewers.items()):
+            if now - last_seen > self.viewer_timeout:
+                del self.viewers[address]
+
+    def _send(self, packet, address):
+        try:
+            self.socket.sendto(packet, address)
+        except (BlockingIOError, ConnectionError):
+            pass  # UDP: Zuschauer verpassen höchstens ein Bild
+
+    def _send_loop(self):
+        while self._running:
+            with self._new_packet:
+                if not self._packets:
+                    self._new_packet.wait(timeout=0.1)
+                packets = list(self._packets)
+                self._packets.clear()
+
+            self._accept_viewers()
+            for packet in packets:
+                for address in list(self.viewers):
+                    self._send(packet, address)
+
+    def close(self):
+        self._running = False
+        with self._new_packet:
+            self._new_packet.notify()
+        self._thread.join()
+        self.socket.close()
+
+
+class SpectatorClient:
+    """Zeigt ein Spiel, das von einem 'SpectatorFeed' übertragen wird."""
+
+    def __init__(
+        self, matchfield, feed_address, address=("127.0.0.1", 0), resubscribe=1.0
+    ):
+        self.matchfield = matchfield
+        self.feed_address = feed_address
+        self.codec = SnapshotCodec(matchfield.max_active_balls_on_field)
+        matchfield.input_source = None
+
+        self.socket = _open_udp_socket(address)
+        self.resubscribe = resubscribe
+        self._last_subscribe = None
+
+        self.latest_tick = None
+        self._keyframe = None
+
+    def subscribe(self):
+        self.socket.sendto(WATCH_PACKET, self.feed_address)
+        self._last_subscribe = time.monotonic()
+
+    def poll(self):
+        """Verarbeitet alle angekommenen Bilder. Gibt True zurück, wenn es ein neues gab."""
+        if (
+            self._last_subscribe is None
+            or time.monotonic() - self._last_subscribe > self.resubscribe
+        ):
+            self.subscribe()
+
+        newest = None
+        for packet, _ in _receive_all(self.socket):
+            if len(packet) < SNAPSHOT_PACKET.size:
+                continue
+            magic, kind, tick, base_tick, _ = SNAPSHOT_PACKET.unpack_from(packet)
+            if magic != SNAPSHOT_MAGIC:
+                continue
+            payload = packet[SNAPSHOT_PACKET.size :]
+
+            if kind == SnapshotCodec.KEYFRAME:
+                base_bytes = None
+            elif self._keyframe is not None and self._keyframe[0] == base_tick:
+                base_bytes = self._keyframe[1]
+            else:
+                continue  # Schlüsselbild fehlt noch
+
+            # Ein kaputtes oder fremdes Paket wird wie ein verlorenes behandelt
+            try:
+                frame_bytes = self.codec.decode(kind, payload, base_bytes)
+            except ValueError:
+                continue
+            if kind == SnapshotCodec.KEYFRAME:
+                self._keyframe = (tick, payload)
+
+            if self.latest_tick is None or tick > self.latest_tick:
+                self.latest_tick = tick
+                newest = frame_bytes
+
+        if newest is None:
+            return False
+        restore_frame(self.matchfield, self.codec.frame(newest))
+        return True
+
+    def close(self):
+        self.socket.close()
+
+
+def watch_match(address, ball_count=3, fps=60):
+    """Zeigt ein Spiel, das mit '--spectators' übertragen wird."""
+    pygame.init()
+
+    app = Application(
+        WINDOW_WIDTH, WINDOW_HEIGHT, caption="Codecentric: Pong (Zuschauer)"
+    )
+    matchfield = Matchfield(app.main_window, ball_count)
+    spectator = SpectatorClient(matchfield, address)
+
+    app.isRunning = True
+    while app.isRunning:
+        app.clock.tick(fps)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                app.isRunning = False
+
+        spectator.poll()
+        matchfield.render()
+
+    spectator.close()
+
+
+class FixedTimestepLoop:
+    """
+    Trennt die Spielphysik von der Bildrate (Google: fix your timestep).
+
+    Die vergangene Zeit wird in einem "Konto" (engl. accumulator) gesammelt.
+    Solange genug Zeit für einen Physik-Schritt vorhanden ist, wird ein
+    Schritt mit fester Länge berechnet. Sinkt die Bildrate, werden pro Bild
+    einfach mehr Schritte berechnet. Die Spielgeschwindigkeit bleibt gleich.
+    """
+
+    # Alle Geschwindigkeiten sind in Pixel pro Frame bei 60 Hz angegeben
+    base_rate = 60
+
+    def __init__(self, matchfield, tick_rate=60, max_frame_time=0.25):
+        self.matchfield = matchfield
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        self.frames_per_tick = self.base_rate / tick_rate
+        if self.frames_per_tick.is_integer():
+            self.frames_per_tick = int(self.frames_per_tick)
+
+        # Nach einer langen Pause (z.B. Fenster verschoben) nicht versuchen,
+        # die gesamte Zeit auf einmal nachzurechnen
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+        matchfield.interpolate = True
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.tick_seconds
+
+    def advance(self, frame_seconds):
+        """Berechnet so viele Physik-Schritte, wie in 'frame_seconds' passen."""
+        self.accumulator += min(frame_seconds, self.max_frame_time)
+
+        ticks = 0
+        while self.accumulator >= self.tick_seconds:
+            self.matchfield.step(self.frames_per_tick)
+            self.accumulator -= self.tick_seconds
+            ticks += 1
+
+        return ticks
+
+
+class FrameTimings:
+    """
+    Misst, wie lange die einzelnen Phasen eines Frames dauern.
+
+    Pro Phase werden die Zeiten der letzten 'window' Frames in einem
+    Ringpuffer (Google: ring buffer) gespeichert. Daraus werden bei Bedarf
+    die Perzentile p50/p95/p99 berechnet. So sieht man, welche Phase das
+    Budget von 16,6 ms pro Frame (60 FPS) sprengt, wenn das Spiel ruckelt.
+
+        timings.start()
+        ...                              # z.B. Spielfeld zeichnen
+        timings.lap("field_redraw")      # Zeit seit 'start' bzw. letztem 'lap'
+        ...
+        timings.end_frame()
+    """
+
+    phases = (
+        "input",
+        "ball_movement",
+        "field_redraw",
+        "scoreboard",
+        "sprite_draw",
+        "debugger",
+        "display_flip",
+    )
+    percentile_levels = (50, 95, 99)
+
+    def __init__(self, window=600):
+        self.window = window
+        self.frame_count = 0
+
+        # Sekunden pro Phase (Zeile) und Frame (Spalte)
+        self._samples = np.zeros((len(self.phases), window))
+        self._phase_index = {phase: index for index, phase in enumerate(self.phases)}
+        self._current = [0.0] * len(self.phases)
+        self._last = time.perf_counter()
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        # Ein Frame kann mehrere Physik-Schritte enthalten, deshalb wird addiert
+        now = time.perf_counter()
+        self._current[self._phase_index[phase]] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        self._samples[:, self.frame_count % self.window] = self._current
+        self._current = [0.0] * len(self.phases)
+        self.frame_count += 1
+
+    def _recent_samples(self):
+        return self._samples[:, : min(self.frame_count, self.window)]
+
+    def percentiles(self, phase=None):
+        """
+        Gibt (p50, p95, p99) in Millisekunden für eine Phase zurück.
+        Ohne 'phase' gelten die Werte für die Summe aller Phasen.
+        """
+        samples = self._recent_samples()
+        if not samples.shape[1]:
+            return (0.0,) * len(self.percentile_levels)
+
+        if phase is None:
+            values = samples.sum(axis=0)
+        else:
+            values = samples[self._phase_index[phase]]
+
+        return tuple(
+            float(value) * 1000
+            for value in np.percentile(values, self.percentile_levels)
+        )
 
-        self.main_window.blit(scoreboard_player_a, score_board_rect_a)
-        self.main_window.blit(scoreboard_player_b, score_board_rect_b)
+    def summary(self):
+        """Alle Perzentile als dict, z.B. für ein JSON-Protokoll."""
+        summary = {}
+        for phase in (*self.phases, "total"):
+            values = self.percentiles(None if phase == "total" else phase)
+            summary[phase] = {
+                f"p{level}": value
+                for level, value in zip(self.percentile_levels, values)
+            }
+        return summary
 
-    def _redraw_field(self):
-        # Google: Hex Color Picker
-        # Farbzusammenstellung: Rot, Grün, Blau (Werte zwischen 0 und 255)
-        background_color_rgb = (26, 62, 102)
-        self.main_window.fill(background_color_rgb)
 
-    def run_match(self):
-        self._redraw_field()  # Sollte zu Anfang der 'Game-Loop' stehen
+class FrameCapture:
+    """
+    Liest das gezeichnete Bild eines Fensters für Agenten, die aus Pixeln
+    lernen.
 
-        for ball in self.balls:
-            self.move_ball(ball)
+    'pygame.surfarray' liefert numpy arrays, die direkt auf die Pixel der
+    Surface zeigen, ohne sie zu kopieren (Google: zero-copy view). Auch das
+    Verkleinern mit 'downsample' (jedes n-te Pixel) ist nur eine andere
+    Sicht auf dieselben Daten. Das Ergebnis landet in 'frame', einem array,
+    das einmal angelegt und dann bei jedem Bild wiederverwendet wird.
 
-        self.move_player()
+    Achtung: Solange eine Sicht aus 'view' existiert, ist die Surface
+    gesperrt und es kann nicht darauf gezeichnet werden.
+    """
 
-        self._draw_scoreboard()
-        self.game_object_sprites.draw(self.main_window)
+    # Gewichte für Graustufen in ganzen Zahlen (Summe 256), ITU-R BT.601
+    gray_weights = (77, 150, 29)
 
-        if not self.debugger is None:
-            if self.debugger.showOnScreen:
-                self.debugger.show_fps()
-                self.debugger.show_coords()
-                self.debugger.show_paddle_coord()
-                self.debugger.show_music()
-                self.debugger.show_active_balls()
-                self.debugger.show_version()
+    def __init__(self, surface, grayscale=False, downsample=1):
+        self.surface = surface
+        self.grayscale = grayscale
+        self.downsample = downsample
+        self.frame_count = 0
 
-        # Erneuert das gesamte Fenster mit den bewegten Sprites, Fonts etc.
-        pygame.display.flip()  # Sollte zum Ende der 'Game-Loop' stehen
+        width, height = surface.get_size()
+        size = (-(-height // downsample), -(-width // downsample))
+
+        # 'frame' hat die Form (Zeile, Spalte) bzw. (Zeile, Spalte, Farbe)
+        self._pixels = None
+        if grayscale:
+            self.frame = np.zeros(size, dtype=np.uint8)
+            self._weighted = np.zeros(size, dtype=np.uint16)
+            self._channel = np.zeros(size, dtype=np.uint16)
+            self.pixel_format = "gray"
+        else:
+            self.frame = self._color_view(size)
+            if self.frame is None:
+                self.frame = np.zeros(size + (3,), dtype=np.uint8)
+                self.pixel_format = "rgb24"
+
+    def _color_view(self, size):
+        """
+        Bei 32 Bit pro Pixel werden die ganzen Pixel (je 4 Bytes) kopiert,
+        das ist ein einfacher, schneller Speicherblock. 'frame' ist dann nur
+        eine Sicht auf die Bytes mit Rot, Grün und Blau darin. Drei von vier
+        Bytes einzeln herauszukopieren wäre um ein Vielfaches langsamer.
+        """
+        if self.surface.get_bytesize() != 4:
+            return None
+
+        shifts = self.surface.get_shifts()[:3]
+        red, green, blue = (
+            shift // 8 if np.little_endian else 3 - shift // 8 for shift in shifts
+        )
+        step = green - red
+        if step not in (1, -1) or blue - green != step:
+            return None
+
+        self._pixels = np.zeros(size, dtype=np.uint32)
+        channels = self._pixels.view(np.uint8).reshape(size + (4,))
+        # Namen wie bei ffmpeg: Reihenfolge der Bytes, '0' = ungenutzt
+        self.pixel_format = {
+            (0, 1): "rgb0",
+            (1, 1): "0rgb",
+            (2, -1): "bgr0",
+            (3, -1): "0bgr",
+        }[red, step]
+
+        stop = red + 3 * step
+        return channels[..., red : (stop if stop >= 0 else None) : step]
+
+    @property
+    def raw(self):
+        """
+        Das array, in das 'capture' wirklich schreibt, ohne Lücken im Speicher.
+        Der Aufbau der Pixel steht in 'pixel_format'.
+        """
+        return self.frame if self._pixels is None else self._pixels
+
+    @contextmanager
+    def view(self):
+        """
+        Die (verkleinerten) Pixel direkt aus der Surface, Form (Zeile, Spalte, 3).
+
+        'surfarray' zählt zuerst x, dann y. Hier wird die Sicht gedreht, damit
+        die Pixel in derselben Reihenfolge gelesen werden, in der sie im
+        Speicher liegen.
+        """
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        try:
+            yield pixels.swapaxes(0, 1)[:: self.downsample, :: self.downsample]
+        finally:
+            # Gibt die Sperre der Surface wieder frei
+            del pixels
+
+    def capture(self):
+        """Schreibt das aktuelle Bild in 'frame' und gibt 'frame' zurück."""
+        step = self.downsample
+
+        if self._pixels is not None:
+            pixels = pygame.surfarray.pixels2d(self.surface)
+            try:
+                np.copyto(self._pixels, pixels.T[::step, ::step])
+            finally:
+                del pixels
+        else:
+            with self.view() as pixels:
+                if self.grayscale:
+                    self._to_grayscale(pixels)
+                else:
+                    np.copyto(self.frame, pixels)
+
+        self.frame_count += 1
+        return self.frame
+
+    def _to_grayscale(self, pixels):
+        red, green, blue = self.gray_weights
+        weighted, channel = self._weighted, self._channel
+
+        np.multiply(pixels[..., 0], red, out=weighted, dtype=np.uint16)
+        np.multiply(pixels[..., 1], green, out=channel, dtype=np.uint16)
+        weighted += channel
+        np.multiply(pixels[..., 2], blue, out=channel, dtype=np.uint16)
+        weighted += channel
+        np.right_shift(weighted, 8, out=self.frame, casting="unsafe")
+
+
+class VideoRecorder:
+    """
+    Nimmt jedes gezeichnete Bild auf, ohne die Game-Loop aufzuhalten.
+
+    Die Bilder wandern durch einen Ringpuffer (Google: ring buffer) aus
+    'ring_size' fest angelegten 'FrameCapture' arrays. Die Game-Loop kopiert
+    das Bild in einen freien Platz, ein eigener Thread schreibt es auf die
+    Festplatte und gibt den Platz wieder frei. Ist kein Platz frei (die
+    Festplatte ist zu langsam), wird das Bild übersprungen, statt zu warten.
+
+    Formate:
+      "raw"  alle Bilder hintereinander in einer Datei. Größe, Bildrate und
+             Pixelformat stehen in '<path>.json', z.B. für ffmpeg:
+             ffmpeg -f rawvideo -pixel_format bgr0 -video_size 1024x768
+                    -framerate 60 -i spiel.raw spiel.mp4
+      "png"  ein Bild pro Datei, 'path' enthält einen Platzhalter für die
+             Nummer, z.B. "bilder/frame_%06d.png"
+    """
+
+    def __init__(
+        self, surface, path, video_format="raw", ring_size=8, downsample=1, fps=60
+    ):
+        self.path = path
+        self.video_format = video_format
+        self.fps = fps
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+
+        self._slots = [
+            FrameCapture(surface, downsample=downsample) for _ in range(ring_size)
+        ]
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for index in range(ring_size):
+            self._free.put(index)
+
+        self._file = open(path, "wb") if video_format == "raw" else None
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def record(self):
+        """Kopiert das aktuelle Bild in den Ringpuffer. Wartet nie."""
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.frames_dropped += 1
+            return False
+
+        self._slots[index].capture()
+        self._filled.put((self.frames_recorded, index))
+        self.frames_recorded += 1
+        return True
+
+    def _write_loop(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+
+            number, index = item
+            slot = self._slots[index]
+            if self._file is not None:
+                self._file.write(slot.raw.data)
+            else:
+                height, width = slot.raw.shape[:2]
+                image = pygame.image.frombuffer(
+                    slot.frame.copy().data, (width, height), "RGB"
+                )
+                pygame.image.save(image, self.path % number)
+            self._free.put(index)
+
+    def close(self):
+        """Wartet, bis alle Bilder geschrieben sind, und schließt die Datei."""
+        self._filled.put(None)
+        self._thread.join()
+
+        if self._file is not None:
+            self._file.close()
+            height, width = self._slots[0].raw.shape[:2]
+            info = {
+                "width": width,
+                "height": height,
+                "fps": self.fps,
+                "pixel_format": self._slots[0].pixel_format,
+                "frames": self.frames_recorded,
+                "dropped": self.frames_dropped,
+            }
+            with open(f"{self.path}.json", "w") as info_file:
+                json.dump(info, info_file, indent=2)
+
+
+class GlyphAtlas:
+    """
+    Einzelne Zeichen, die nur einmal gerendert werden (Google: glyph atlas).
+
+    Zahlen in der Debug-Anzeige ändern sich fast in jedem Frame. Statt jedes
+    Mal den ganzen Text mit 'font.render' zu erzeugen, werden die Ziffern
+    einzeln aus diesem Vorrat zusammengesetzt. Fehlende Zeichen werden beim
+    ersten Gebrauch nachgerendert.
+    """
+
+    characters = "0123456789-+.: "
+
+    def __init__(self, font, color, background):
+        self.font = font
+        self.color = color
+        self.background = background
+        self.glyphs = {}
+        for character in self.characters:
+            self._render(character)
+
+    def _render(self, character):
+        glyph = self.font.render(character, True, self.color, self.background)
+        self.glyphs[character] = prepare_surface(glyph)
+        return self.glyphs[character]
+
+    def draw(self, surface, text, position):
+        """Zeichnet 'text' ab 'position' und gibt das x hinter dem Text zurück."""
+        x, y = position
+        for character in text:
+            glyph = self.glyphs.get(character) or self._render(character)
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+
+class DebugHud:
+    """
+    Alle Zeilen der Debug-Anzeige auf einer einzigen, zwischengespeicherten
+    Surface.
+
+    Eine Zeile besteht aus Teilen, z.B. ("Ball 0 at (x: ", 512, ")"). Texte
+    werden einmal gerendert und wiederverwendet, Zahlen kommen aus dem
+    'GlyphAtlas'. Eine Zeile wird nur neu gezeichnet, wenn sich einer ihrer
+    Teile geändert hat. Pro Frame wird dann nur noch ein 'blit' pro Zeile
+    gebraucht, und zwar nur so breit wie der Text der Zeile.
+    """
+
+    def __init__(self, font, color, background, width, line_height=12):
+        self.font = font
+        self.color = color
+        self.background = background
+        self.width = width
+        self.line_height = line_height
+        self.atlas = GlyphAtlas(font, color, background)
+
+        self._texts = {}
+        self._lines = []
+        self._line_widths = []
+        self.surface = self._create_surface(8)
+
+    def _create_surface(self, line_count):
+        surface = pygame.Surface((self.width, line_count * self.line_height))
+        return prepare_surface(surface)
+
+    def _text(self, text):
+        if text not in self._texts:
+            self._texts[text] = prepare_surface(
+                self.font.render(text, True, self.color, self.background)
+            )
+        return self._texts[text]
+
+    @property
+    def height(self):
+        return len(self._lines) * self.line_height
+
+    @property
+    def used_width(self):
+        return max(self._line_widths, default=0)
+
+    def set_line(self, index, parts):
+        """Setzt Zeile 'index'. Gerendert wird nur, wenn sich etwas geändert hat."""
+        parts = tuple(parts)
+        if index < len(self._lines) and self._lines[index] == parts:
+            return False
+
+        if index >= len(self._lines):
+            missing = index + 1 - len(self._lines)
+            self._lines.extend([()] * missing)
+            self._line_widths.extend([0] * missing)
+        if self.height > self.surface.get_height():
+            surface = self._create_surface(len(self._lines) * 2)
+            surface.blit(self.surface, (0, 0))
+            self.surface = surface
+
+        self._lines[index] = parts
+        y = index * self.line_height
+        self.surface.fill(self.background, (0, y, self.width, self.line_height))
+
+        x = 0
+        for part in parts:
+            if isinstance(part, str):
+                text = self._text(part)
+                self.surface.blit(text, (x, y))
+                x += text.get_width()
+            else:
+                number = f"{part:.2f}" if isinstance(part, float) else str(part)
+                x = self.atlas.draw(self.surface, number, (x, y))
+
+        self._line_widths[index] = min(x, self.width)
+        return True
+
+    def draw(self, target):
+        for index, width in enumerate(self._line_widths):
+            y = index * self.line_height
+            target.blit(self.surface, (0, y), (0, y, width, self.line_height))
 
 
 class Debugger:
@@ -441,88 +4204,299 @@ class Debugger:
         self.app = app
         self.match = match
         self.showOnScreen = False
-        self.font = pygame.font.SysFont("Consolas", 12)
+        self.font = FONTS.get("Consolas", 12)
         self.font_color = (41, 255, 144)
-        self.font_bg = (0, 0, 0, 1)
+        self.font_bg = (0, 0, 0)
 
         self.refresh_tick = 0
         self.debug_coords = (0, 0)
 
-    def show_fps(self):
-        show_at_coordinates = (0, 0)
-        fps_text = str(int(self.app.clock.get_fps()))
+        # Die 'show_...' Methoden schreiben nur noch in die Zeilen der
+        # Anzeige, 'draw' zeichnet sie dann mit einem einzigen 'blit'
+        self.line_height = 12
+        self.hud = DebugHud(
+            self.font,
+            self.font_color,
+            self.font_bg,
+            app.main_window.get_width(),
+            self.line_height,
+        )
+
+        # Die Perzentile werden nur alle 'frame_times_refresh' Frames neu
+        # berechnet, sonst kostet die Anzeige selbst zu viel Zeit
+        self.frame_times_line = 7
+        self.frame_times_refresh = 30
+        self._frame_times_tick = 0
+
+    def overlay_rect(self):
+        """Bereich des Fensters, den die Debug-Anzeige belegt."""
+        return pygame.Rect(0, 0, self.hud.used_width, self.hud.height)
 
-        fps_counter = self.font.render(fps_text, True, self.font_color, self.font_bg)
-        self.app.main_window.blit(fps_counter, show_at_coordinates)
+    def draw(self):
+        self.hud.draw(self.app.main_window)
+
+    def show_fps(self):
+        self.hud.set_line(0, (int(self.app.clock.get_fps()),))
 
     def show_coords(self):
         self.refresh_tick += 1
-        show_at_coordinates = (0, 12)
+        ball_x, ball_y, ball_speed, ball_angle = self.match.ball_debug_state(0)
         if self.refresh_tick > 3:
-            coords_as_str = f"Ball 0 at (x: {self.match.balls[0].rect.centerx} | y: {self.match.balls[0].rect.centery}) Speed: {self.match.balls[0].speed[0]} | Angle: {self.match.balls[0].speed[1]}"
-            self.debug_coords = (
-                self.match.balls[0].rect.centerx,
-                self.match.balls[0].rect.centery,
-            )
+            self.debug_coords = (ball_x, ball_y)
             self.refresh_tick = 0
-        else:
-            coords_as_str = f"Ball 0 at (x: {self.debug_coords[0]} | y: {self.debug_coords[1]}) Speed: {self.match.balls[0].speed[0]} | Angle: {self.match.balls[0].speed[1]}"
 
-        coords = self.font.render(
-            str(coords_as_str), True, (41, 255, 144), (0, 0, 0, 1)
+        self.hud.set_line(
+            1,
+            (
+                "Ball 0 at (x: ",
+                self.debug_coords[0],
+                " | y: ",
+                self.debug_coords[1],
+                ") Speed: ",
+                ball_speed,
+                " | Angle: ",
+                ball_angle,
+            ),
         )
 
-        self.app.main_window.blit(coords, show_at_coordinates)
-
     def show_paddle_coord(self):
-        show_at_coordinates_left = (0, 24)
-
-        coords_as_str_left = f"Left player: (x: {self.match.player_left.rect.centerx} | y: {self.match.player_left.rect.centery})"
-        coords_left = self.font.render(
-            str(coords_as_str_left), True, (41, 255, 144), (0, 0, 0, 1)
+        left = self.match.player_left.rect
+        right = self.match.player_right.rect
+        self.hud.set_line(
+            2, ("Left player: (x: ", left.centerx, " | y: ", left.centery, ")")
         )
-        show_at_coordinates_right = (0, 36)
-
-        coords_as_str_right = f"Right player: (x: {self.match.player_right.rect.centerx} | y: {self.match.player_right.rect.centery})"
-        coords_right = self.font.render(
-            str(coords_as_str_right), True, (41, 255, 144), (0, 0, 0, 1)
+        self.hud.set_line(
+            3, ("Right player: (x: ", right.centerx, " | y: ", right.centery, ")")
         )
-        self.app.main_window.blit(coords_left, show_at_coordinates_left)
-        self.app.main_window.blit(coords_right, show_at_coordinates_right)
 
     def show_music(self):
-        show_at_coordinates_left = (0, 48)
-
-        music_txt = f"Background music: {self.match.sounds.selected_song} | is playing? {self.match.sounds.isBackgroundOn}"
-        music_rect = self.font.render(
-            str(music_txt), True, (41, 255, 144), (0, 0, 0, 1)
+        sounds = self.match.sounds
+        self.hud.set_line(
+            4,
+            (
+                f"Background music: {sounds.selected_song} | is playing? ",
+                str(sounds.isBackgroundOn),
+            ),
         )
-        self.app.main_window.blit(music_rect, show_at_coordinates_left)
 
     def show_active_balls(self):
-        show_at_coordinates_left = (0, 60)
-
-        debug_txt = f"Active Balls: {self.match.current_active_balls_on_field}/{self.match.max_active_balls_on_field}"
-        debug_rect = self.font.render(
-            str(debug_txt), True, (41, 255, 144), (0, 0, 0, 1)
+        self.hud.set_line(
+            5,
+            (
+                "Active Balls: ",
+                self.match.current_active_balls_on_field,
+                "/",
+                self.match.max_active_balls_on_field,
+            ),
         )
-        self.app.main_window.blit(debug_rect, show_at_coordinates_left)
 
     def show_version(self):
-        show_at_coordinates_left = (0, 72)
+        self.hud.set_line(6, (f"Version: {VERSION}",))
+
+    def show_frame_times(self):
+        timings = self.match.timings
+        if timings is None:
+            return
+
+        self._frame_times_tick = (self._frame_times_tick + 1) % self.frame_times_refresh
+        if self._frame_times_tick != 1 and self.frame_times_refresh > 1:
+            return
+
+        line = self.frame_times_line
+        self.hud.set_line(line, ("Frame times (ms)      p50 |   p95 |   p99",))
+        for phase in (*timings.phases, None):
+            line += 1
+            p50, p95, p99 = timings.percentiles(phase)
+            self.hud.set_line(
+                line,
+                (f"{phase or 'total':<16}", p50, " | ", p95, " | ", p99),
+            )
+
+
+def simulate_headless(
+    frames,
+    ball_count=3,
+    window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+    vectorized=None,
+    step_frames=1,
+    seed=None,
+    record_path=None,
+):
+    """
+    Lässt ein Spiel ohne Fenster, Sound und Bildrate-Begrenzung laufen.
+
+    Es wird kein 'pygame.init()' benötigt, da nur mit einer Surface im
+    Arbeitsspeicher gerechnet wird. Die Schleife läuft so schnell, wie die
+    CPU es zulässt (kein 'clock.tick'). Mit 'step_frames' werden mehrere
+    Frames in einem Physik-Schritt berechnet. Mit 'record_path' wird jeder
+    Schritt in eine Replay-Datei geschrieben ('ReplayWriter').
+    """
+    app = Application(*window_size, headless=True)
+    matchfield = Matchfield(
+        app.main_window, ball_count, headless=True, vectorized=vectorized, seed=seed
+    )
+    if record_path is not None:
+        matchfield.recorder = ReplayWriter(record_path, matchfield)
+
+    try:
+        for _ in range(0, frames, step_frames):
+            matchfield.step(step_frames)
+    finally:
+        if matchfield.recorder is not None:
+            matchfield.recorder.close()
+    return matchfield
+
+
+def play_headless_match(
+    matchfield, points_to_win=5, max_frames=60 * 60 * 10, step_frames=1
+):
+    """
+    Spielt ein Spiel im 'headless' Modus, bis ein Spieler 'points_to_win'
+    Punkte hat oder 'max_frames' Frames berechnet wurden.
+    """
+    frames = 0
+    while frames < max_frames:
+        if max(matchfield.player_left.score, matchfield.player_right.score) >= (
+            points_to_win
+        ):
+            break
+        matchfield.step(step_frames)
+        frames += step_frames
+
+    return {
+        "score_left": matchfield.player_left.score,
+        "score_right": matchfield.player_right.score,
+        "frames": frames,
+        "rallies": matchfield.rallies,
+    }
+
+
+# Jeder Prozess im Pool (engl. worker) bekommt einmalig ein eigenes Spielfeld
+# (Surface), das für alle Spiele wiederverwendet wird, die der Prozess berechnet.
+_worker_app = None
+_worker_settings = None
+
+
+def _init_simulation_worker(settings):
+    global _worker_app, _worker_settings
 
-        version_txt = f"Version: {VERSION}"
-        version_rect = self.font.render(
-            str(version_txt), True, (41, 255, 144), (0, 0, 0, 1)
+    _worker_settings = settings
+    _worker_app = Application(*settings["window_size"], headless=True)
+
+
+def _simulate_match(match_index):
+    # Jedes Spiel hat seinen eigenen Zufallsgenerator. Mit einem festen
+    # 'seed' ist das Ergebnis unabhängig davon, welcher Prozess es berechnet.
+    seed = _worker_settings["seed"]
+    matchfield = Matchfield(
+        _worker_app.main_window,
+        _worker_settings["ball_count"],
+        headless=True,
+        seed=None if seed is None else (seed, match_index),
+    )
+    if _worker_settings["bots"]:
+        matchfield.input_source = SplitInput(
+            left=TrajectoryBot(PlayerSide.LEFT), right=TrajectoryBot(PlayerSide.RIGHT)
         )
-        self.app.main_window.blit(version_rect, show_at_coordinates_left)
+    return play_headless_match(
+        matchfield,
+        _worker_settings["points_to_win"],
+        _worker_settings["max_frames"],
+        _worker_settings["step_frames"],
+    )
+
+
+def simulate_matches(
+    matches,
+    workers=None,
+    ball_count=3,
+    points_to_win=5,
+    max_frames=60 * 60 * 10,
+    window_size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+    step_frames=1,
+    seed=None,
+    bots=False,
+):
+    """
+    Verteilt 'matches' Spiele im 'headless' Modus auf einen Pool aus
+    'workers' Prozessen (Google: Python multiprocessing Pool) und fasst die
+    Ergebnisse zu einer Statistik zusammen. Mit 'bots' werden beide
+    Schläger von einem 'TrajectoryBot' gesteuert.
+    """
+    workers = workers or os.cpu_count()
+    settings = {
+        "ball_count": ball_count,
+        "points_to_win": points_to_win,
+        "max_frames": max_frames,
+        "window_size": window_size,
+        "step_frames": step_frames,
+        "seed": seed,
+        "bots": bots,
+    }
+
+    # Mehrere Spiele pro Auftrag sparen Kommunikation zwischen den Prozessen
+    chunksize = max(1, matches // (workers * 8))
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(
+        workers, initializer=_init_simulation_worker, initargs=(settings,)
+    ) as pool:
+        results = list(pool.imap_unordered(_simulate_match, range(matches), chunksize))
+    seconds = time.perf_counter() - start
 
+    score_left = np.array([result["score_left"] for result in results])
+    score_right = np.array([result["score_right"] for result in results])
+    frames = np.array([result["frames"] for result in results])
+    rallies = np.array(
+        [hits for result in results for hits in result["rallies"]], dtype=np.int64
+    )
+    # Spiele, die bei 'max_frames' abgebrochen wurden, haben keinen Sieger
+    finished = np.maximum(score_left, score_right) >= points_to_win
 
-def main():
+    return {
+        "matches": matches,
+        "workers": workers,
+        "ball_count": ball_count,
+        "points_to_win": points_to_win,
+        "seed": seed,
+        "bots": bots,
+        "seconds": seconds,
+        "matches_per_second": matches / seconds if seconds else None,
+        "wins_left": int(np.count_nonzero(finished & (score_left > score_right))),
+        "wins_right": int(np.count_nonzero(finished & (score_right > score_left))),
+        "draws": int(np.count_nonzero(finished & (score_left == score_right))),
+        "unfinished": int(np.count_nonzero(~finished)),
+        "mean_score_left": float(score_left.mean()) if matches else 0.0,
+        "mean_score_right": float(score_right.mean()) if matches else 0.0,
+        "total_frames": int(frames.sum()),
+        "rallies": int(rallies.size),
+        "mean_rally_hits": float(rallies.mean()) if rallies.size else 0.0,
+        "max_rally_hits": int(rallies.max()) if rallies.size else 0,
+    }
+
+
+def main(
+    ball_count=3,
+    dirty_rects=False,
+    tick_rate=60,
+    fps=60,
+    record_path=None,
+    spectator_address=None,
+    video_path=None,
+):
     pygame.init()
 
     app = Application(WINDOW_WIDTH, WINDOW_HEIGHT)
-    matchfield = Matchfield(app.main_window)
+    matchfield = Matchfield(app.main_window, ball_count, dirty_rects=dirty_rects)
+    if record_path is not None:
+        matchfield.recorder = ReplayWriter(record_path, matchfield)
+    spectators = None
+    if spectator_address is not None:
+        spectators = SpectatorFeed(matchfield, spectator_address)
+    if video_path is not None:
+        matchfield.video_recorder = VideoRecorder(app.main_window, video_path, fps=fps)
+    matchfield.timings = FrameTimings()
+    game_loop = FixedTimestepLoop(matchfield, tick_rate)
 
     # Google: Header-Guard
     # Wird häufig in der Programmierpsrache C/C++ verwendet
@@ -530,23 +4504,195 @@ def main():
         matchfield.debugger = Debugger(app, matchfield)
 
     app.isRunning = True
-    while app.isRunning:
-        app.clock.tick(60)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                app.isRunning = False
+    # Aufnahmen und Zuschauer werden auch bei einem Fehler oder Strg+C
+    # sauber beendet, sonst fehlen die letzten Frames in den Dateien
+    try:
+        while app.isRunning:
+            # Millisekunden seit dem letzten Bild
+            frame_ms = app.clock.tick(fps)
 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    matchfield.sounds.toggle_background_music()
-                if event.key == pygame.K_F1:
-                    matchfield.debugger.showOnScreen = (
-                        not matchfield.debugger.showOnScreen
-                    )
+            matchfield.timings.start()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    app.isRunning = False
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        matchfield.sounds.toggle_background_music()
+                    if event.key == pygame.K_F1:
+                        matchfield.debugger.showOnScreen = (
+                            not matchfield.debugger.showOnScreen
+                        )
+            matchfield.timings.lap("input")
 
-        matchfield.run_match()
+            # Physik mit fester Rate, Zeichnen mit der Bildrate des Bildschirms
+            ticks = game_loop.advance(frame_ms / 1000)
+            if spectators is not None and ticks:
+                spectators.publish(matchfield)
+            matchfield.render(game_loop.alpha)
+    finally:
+        if matchfield.recorder is not None:
+            matchfield.recorder.close()
+        if spectators is not None:
+            spectators.close()
+        if matchfield.video_recorder is not None:
+            matchfield.video_recorder.close()
+
+
+def cli(argv=None):
+    # Google: Python argparse
+    parser = argparse.ArgumentParser(description="Codecentric: Pong")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="ohne Fenster, Sound und Bildrate-Begrenzung simulieren",
+    )
+    parser.add_argument("--frames", type=int, default=60 * 60)
+    parser.add_argument("--balls", type=int, default=3)
+    parser.add_argument(
+        "--step-frames",
+        type=int,
+        default=1,
+        help="Anzahl Frames pro Physik-Schritt im headless Modus",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Startwert für reproduzierbare Spiele"
+    )
+    parser.add_argument(
+        "--tick-rate",
+        type=int,
+        default=60,
+        help="Physik-Schritte pro Sekunde, unabhängig von der Bildrate",
+    )
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="nur veränderte Bereiche des Fensters neu zeichnen",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="jeden Physik-Schritt in diese Replay-Datei schreiben",
+    )
+    parser.add_argument(
+        "--spectators",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="das Spiel an Zuschauer auf diesem UDP-Port übertragen",
+    )
+    parser.add_argument(
+        "--record-video",
+        default=None,
+        metavar="PATH",
+        help="jedes Bild als Rohvideo in diese Datei schreiben",
+    )
+
+    commands = parser.add_subparsers(dest="command")
+    simulate = commands.add_parser(
+        "simulate", help="viele Spiele parallel ohne Fenster simulieren"
+    )
+    simulate.add_argument("--matches", type=int, default=1000)
+    simulate.add_argument("--workers", type=int, default=None)
+    simulate.add_argument("--balls", type=int, default=3)
+    simulate.add_argument("--points", type=int, default=5)
+    simulate.add_argument("--max-frames", type=int, default=60 * 60 * 10)
+    simulate.add_argument("--step-frames", type=int, default=1)
+    simulate.add_argument("--seed", type=int, default=None)
+    simulate.add_argument(
+        "--bots", action="store_true", help="beide Schläger vom Computer steuern lassen"
+    )
+    simulate.add_argument(
+        "--output", default="-", help="Datei für das JSON-Ergebnis ('-' = stdout)"
+    )
+
+    host = commands.add_parser(
+        "host", help="ein Spiel für einen Mitspieler im Netzwerk starten"
+    )
+    host.add_argument(
+        "--address", default="0.0.0.0", help="IP-Adresse, auf der gewartet wird"
+    )
+    host.add_argument("--port", type=int, default=5005)
+    host.add_argument("--balls", type=int, default=3)
+    host.add_argument("--seed", type=int, default=None)
+
+    serve = commands.add_parser(
+        "serve", help="viele Spiele ohne Fenster in einem Prozess anbieten"
+    )
+    serve.add_argument("--address", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=5006)
+    serve.add_argument("--balls", type=int, default=3)
+    serve.add_argument("--tick-rate", type=int, default=60)
+    serve.add_argument("--max-matches", type=int, default=1000)
+
+    watch = commands.add_parser("watch", help="einem übertragenen Spiel zusehen")
+    watch.add_argument("address", help="Adresse des Spiels, z.B. 192.168.0.10:5007")
+    watch.add_argument("--balls", type=int, default=3)
+
+    join = commands.add_parser("join", help="einem Spiel im Netzwerk beitreten")
+    join.add_argument("address", help="Adresse des Hosts, z.B. 192.168.0.10:5005")
+    join.add_argument("--balls", type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "simulate":
+        result = simulate_matches(
+            args.matches,
+            args.workers,
+            ball_count=args.balls,
+            points_to_win=args.points,
+            max_frames=args.max_frames,
+            step_frames=args.step_frames,
+            seed=args.seed,
+            bots=args.bots,
+        )
+        if args.output == "-":
+            print(json.dumps(result, indent=2))
+        else:
+            with open(args.output, "w") as output_file:
+                json.dump(result, output_file, indent=2)
+    elif args.command == "host":
+        play_network("host", (args.address, args.port), args.balls, args.seed)
+    elif args.command == "serve":
+        asyncio.run(
+            serve_matches(
+                (args.address, args.port),
+                ball_count=args.balls,
+                tick_rate=args.tick_rate,
+                max_matches=args.max_matches,
+            )
+        )
+    elif args.command == "watch":
+        host_name, _, port = args.address.rpartition(":")
+        watch_match((host_name, int(port)), args.balls)
+    elif args.command == "join":
+        host_name, _, port = args.address.rpartition(":")
+        play_network("join", (host_name, int(port)), args.balls)
+    elif args.headless:
+        match = simulate_headless(
+            args.frames,
+            args.balls,
+            step_frames=args.step_frames,
+            seed=args.seed,
+            record_path=args.record,
+        )
+        print(
+            f"Player A: {match.player_left.score} | Player B: {match.player_right.score}"
+        )
+    else:
+        spectator_address = None
+        if args.spectators is not None:
+            spectator_address = ("0.0.0.0", args.spectators)
+        main(
+            args.balls,
+            args.dirty_rects,
+            args.tick_rate,
+            record_path=args.record,
+            spectator_address=spectator_address,
+            video_path=args.record_video,
+        )
 
 
 if __name__ == "__main__":
-    main()
+    cli()